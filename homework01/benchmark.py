@@ -0,0 +1,259 @@
+import argparse
+import json
+import random
+import string
+import sys
+import time
+import typing as tp
+
+import caesar
+import rsa
+import vigenere
+
+Cipher = tp.Tuple[tp.Callable[[str], tp.Any], tp.Callable[[tp.Any], tp.Any]]
+_CLOCK_RESOLUTION = time.get_clock_info("perf_counter").resolution
+
+
+def bench_keygen(sizes: tp.Sequence[int], repeat: int) -> tp.List[tp.Dict[str, float]]:
+    results = []
+    for bits in sizes:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            rsa.generate_large_keypair(bits)
+            timings.append(time.perf_counter() - start)
+        results.append(
+            {
+                "bits": bits,
+                "min": min(timings),
+                "mean": sum(timings) / len(timings),
+                "max": max(timings),
+            }
+        )
+    return results
+
+
+def bench_batch(
+    bits: int, messages: int, length: int, workers: tp.Sequence[int]
+) -> tp.List[tp.Dict[str, float]]:
+    public, private = rsa.generate_large_keypair(bits)
+    plaintexts = [f"{i:0{length}d}"[:length] for i in range(messages)]
+    ciphertexts = rsa.encrypt_many(public, plaintexts)
+    results = []
+    for n in workers:
+        start = time.perf_counter()
+        rsa.decrypt_many(private, ciphertexts, workers=n)
+        elapsed = time.perf_counter() - start
+        results.append({"workers": n, "seconds": elapsed, "messages_per_sec": messages / elapsed})
+    return results
+
+
+def parse_size(size: str) -> int:
+    """
+    >>> parse_size("64K"), parse_size("1M"), parse_size("100")
+    (65536, 1048576, 100)
+    """
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    size = size.strip().upper()
+    if size and size[-1] in units:
+        return int(size[:-1]) * units[size[-1]]
+    return int(size)
+
+
+def make_text(size: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + " ,.\n"
+    block = "".join(rng.choice(alphabet) for _ in range(4096))
+    return (block * (size // len(block) + 1))[:size]
+
+
+def make_ciphers(rsa_bits: int) -> tp.Dict[str, Cipher]:
+    public, private = rsa.generate_large_keypair(rsa_bits)
+    return {
+        "caesar": (
+            lambda text: caesar.encrypt_caesar(text, 7),
+            lambda ciphertext: caesar.decrypt_caesar(ciphertext, 7),
+        ),
+        "vigenere": (
+            lambda text: vigenere.encrypt_vigenere(text, "LEMON"),
+            lambda ciphertext: vigenere.decrypt_vigenere(ciphertext, "LEMON"),
+        ),
+        "rsa": (
+            lambda text: rsa.encrypt_blocks(public, text),
+            lambda ciphertext: rsa.decrypt_blocks(private, ciphertext),
+        ),
+    }
+
+
+# Key recovery is measured on the ciphertext of the same text
+BREAKERS: tp.Dict[str, tp.Callable[[str], tp.Any]] = {"vigenere": vigenere.break_vigenere}
+
+
+def _best_time(func: tp.Callable[[tp.Any], tp.Any], arg: tp.Any, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_ciphers(
+    sizes: tp.Sequence[int],
+    ciphers: tp.Sequence[str],
+    repeat: int = 3,
+    rsa_bits: int = 1024,
+    rsa_max_size: int = 1 << 16,
+) -> tp.List[tp.Dict[str, tp.Any]]:
+    """
+    Measures encryption and decryption throughput of every cipher
+    for every input size, and key recovery for the ciphers in BREAKERS.
+    RSA is only measured up to rsa_max_size.
+    """
+    available = make_ciphers(rsa_bits)
+    results = []
+    for size in sizes:
+        text = make_text(size)
+        for name in ciphers:
+            if name == "rsa" and size > rsa_max_size:
+                continue
+            encrypt, decrypt = available[name]
+            ciphertext = encrypt(text)
+            operations = [("encrypt", encrypt, text), ("decrypt", decrypt, ciphertext)]
+            if name in BREAKERS:
+                operations.append(("break", BREAKERS[name], ciphertext))
+            for operation, func, arg in operations:
+                # A run faster than the clock resolution would give an infinite
+                # throughput, which json.dump writes as invalid JSON
+                seconds = max(_best_time(func, arg, repeat), _CLOCK_RESOLUTION)
+                results.append(
+                    {
+                        "cipher": name,
+                        "operation": operation,
+                        "size": size,
+                        "seconds": seconds,
+                        "mb_per_sec": size / (1 << 20) / seconds,
+                    }
+                )
+    return results
+
+
+def find_regressions(
+    results: tp.Sequence[tp.Dict[str, tp.Any]],
+    baseline: tp.Sequence[tp.Dict[str, tp.Any]],
+    threshold: float,
+) -> tp.List[str]:
+    """
+    Lists the results whose throughput dropped by more than threshold
+    (a fraction, 0.2 is 20%) compared to the matching baseline result.
+    """
+    expected = {(r["cipher"], r["operation"], r["size"]): r["mb_per_sec"] for r in baseline}
+    regressions = []
+    for result in results:
+        key = (result["cipher"], result["operation"], result["size"])
+        if key not in expected:
+            continue
+        if result["mb_per_sec"] < expected[key] * (1 - threshold):
+            regressions.append(
+                f"{key[0]} {key[1]} {key[2]} bytes: {result['mb_per_sec']:.2f} MB/s, "
+                f"baseline {expected[key]:.2f} MB/s"
+            )
+    return regressions
+
+
+def cmd_keygen(args: argparse.Namespace) -> None:
+    print(f"{'bits':>6} {'min, s':>10} {'mean, s':>10} {'max, s':>10}")
+    for row in bench_keygen(args.bits, args.repeat):
+        print(f"{row['bits']:>6} {row['min']:>10.3f} {row['mean']:>10.3f} {row['max']:>10.3f}")
+
+
+def cmd_batch(args: argparse.Namespace) -> None:
+    print(f"{'workers':>7} {'seconds':>10} {'messages/sec':>14}")
+    for row in bench_batch(args.bits, args.messages, args.length, args.workers):
+        print(f"{row['workers']:>7} {row['seconds']:>10.3f} {row['messages_per_sec']:>14.1f}")
+
+
+def cmd_ciphers(args: argparse.Namespace) -> None:
+    results = bench_ciphers(args.sizes, args.ciphers, args.repeat, args.rsa_bits, args.rsa_max_size)
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        print(report)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.threshold)
+        if regressions:
+            print("Throughput regressions:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            sys.exit(1)
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmarks for the homework ciphers.")
+    subparsers = parser.add_subparsers(title="benchmarks", dest="benchmark", required=True)
+
+    ciphers_parser = subparsers.add_parser("ciphers", help="Cipher throughput per input size")
+    ciphers_parser.add_argument(
+        "--sizes",
+        type=parse_size,
+        nargs="+",
+        default=[parse_size(size) for size in ("1K", "64K", "1M", "16M")],
+        help="Input sizes, e.g. 1K 1M 100M",
+    )
+    ciphers_parser.add_argument(
+        "--ciphers",
+        nargs="+",
+        choices=["caesar", "vigenere", "rsa"],
+        default=["caesar", "vigenere", "rsa"],
+        help="Ciphers to measure",
+    )
+    ciphers_parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement")
+    ciphers_parser.add_argument("--rsa-bits", type=int, default=1024, help="RSA key size")
+    ciphers_parser.add_argument(
+        "--rsa-max-size",
+        type=parse_size,
+        default=parse_size("64K"),
+        help="Largest input size measured for RSA",
+    )
+    ciphers_parser.add_argument("-o", "--output", help="Write JSON results to this file")
+    ciphers_parser.add_argument("--baseline", help="JSON results to compare against")
+    ciphers_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed throughput drop against the baseline as a fraction",
+    )
+    ciphers_parser.set_defaults(func=cmd_ciphers)
+
+    keygen_parser = subparsers.add_parser("keygen", help="RSA key generation time per key size")
+    keygen_parser.add_argument(
+        "--bits", type=int, nargs="+", default=[512, 1024, 2048], help="Key sizes in bits"
+    )
+    keygen_parser.add_argument("--repeat", type=int, default=5, help="Keys per size")
+    keygen_parser.set_defaults(func=cmd_keygen)
+
+    batch_parser = subparsers.add_parser("batch", help="RSA batch decryption throughput")
+    batch_parser.add_argument("--bits", type=int, default=1024, help="Key size in bits")
+    batch_parser.add_argument("--messages", type=int, default=500, help="Number of messages")
+    batch_parser.add_argument("--length", type=int, default=16, help="Message length")
+    batch_parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="Worker process counts"
+    )
+    batch_parser.set_defaults(func=cmd_batch)
+
+    return parser
+
+
+def main(argv: tp.Optional[tp.Sequence[str]] = None) -> None:
+    parser = make_parser()
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
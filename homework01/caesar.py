@@ -1,5 +1,42 @@
+import functools
+import re
+import string
 import typing as tp
 
+# fmt: off
+ENGLISH_FREQUENCIES = (
+    0.08167, 0.01492, 0.02782, 0.04253, 0.12702, 0.02228, 0.02015,
+    0.06094, 0.06966, 0.00153, 0.00772, 0.04025, 0.02406, 0.06749,
+    0.07507, 0.01929, 0.00095, 0.05987, 0.06327, 0.09056, 0.02758,
+    0.00978, 0.02360, 0.00150, 0.01974, 0.00074,
+)
+# fmt: on
+
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+@functools.lru_cache(maxsize=None)
+def _shift_alphabets(shift: int) -> tp.Tuple[str, str]:
+    shift %= 26
+    lower = string.ascii_lowercase
+    upper = string.ascii_uppercase
+    return (
+        lower + upper,
+        lower[shift:] + lower[:shift] + upper[shift:] + upper[:shift],
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _str_table(shift: int) -> tp.Dict[int, int]:
+    source, target = _shift_alphabets(shift)
+    return str.maketrans(source, target)
+
+
+@functools.lru_cache(maxsize=None)
+def _bytes_table(shift: int) -> bytes:
+    source, target = _shift_alphabets(shift)
+    return bytes.maketrans(source.encode("ascii"), target.encode("ascii"))
+
 
 def encrypt_caesar(plaintext: str, shift: int = 3) -> str:
     """
@@ -14,16 +51,7 @@ def encrypt_caesar(plaintext: str, shift: int = 3) -> str:
     >>> encrypt_caesar("")
     ''
     """
-    ciphertext = ""
-    for i in plaintext:
-        if ord("A") <= ord(i) <= ord("Z"):
-            ciphertext += chr(ord("A") + (ord(i) - ord("A") + shift) % 26)
-        elif ord("a") <= ord(i) <= ord("z"):
-            ciphertext += chr(ord("a") + (ord(i) - ord("a") + shift) % 26)
-        else:
-            ciphertext += i
-
-    return ciphertext
+    return plaintext.translate(_str_table(shift % 26))
 
 
 def decrypt_caesar(ciphertext: str, shift: int = 3) -> str:
@@ -39,21 +67,127 @@ def decrypt_caesar(ciphertext: str, shift: int = 3) -> str:
     >>> decrypt_caesar("")
     ''
     """
-    plaintext = ""
-    for i in ciphertext:
-        if ord("A") <= ord(i) <= ord("Z"):
-            plaintext += chr(((ord(i) - ord("A")) - shift) % 26 + ord("A"))
-        elif ord("a") <= ord(i) <= ord("z"):
-            plaintext += chr(((ord(i) - ord("a")) - shift) % 26 + ord("a"))
-        else:
-            plaintext += i
-    return plaintext
+    return ciphertext.translate(_str_table(-shift % 26))
+
+
+def encrypt_caesar_bytes(plaintext: bytes, shift: int = 3) -> bytes:
+    """
+    Encrypts ASCII letters of a binary buffer using a Caesar cipher.
+    All other bytes are left untouched.
+
+    >>> encrypt_caesar_bytes(b"Python3.6\\x00\\xff")
+    b'Sbwkrq3.6\\x00\\xff'
+    """
+    return bytes(plaintext).translate(_bytes_table(shift % 26))
+
+
+def decrypt_caesar_bytes(ciphertext: bytes, shift: int = 3) -> bytes:
+    """
+    Decrypts ASCII letters of a binary buffer using a Caesar cipher.
+
+    >>> decrypt_caesar_bytes(b"Sbwkrq3.6\\x00\\xff")
+    b'Python3.6\\x00\\xff'
+    """
+    return bytes(ciphertext).translate(_bytes_table(-shift % 26))
+
+
+def encrypt_caesar_stream(chunks: tp.Iterable[str], shift: int = 3) -> tp.Iterator[str]:
+    """
+    Encrypts a stream of text chunks using a Caesar cipher.
+
+    >>> list(encrypt_caesar_stream(["PYT", "HON"]))
+    ['SBW', 'KRQ']
+    """
+    for chunk in chunks:
+        yield encrypt_caesar(chunk, shift)
+
+
+def decrypt_caesar_stream(chunks: tp.Iterable[str], shift: int = 3) -> tp.Iterator[str]:
+    """
+    Decrypts a stream of text chunks using a Caesar cipher.
+
+    >>> list(decrypt_caesar_stream(["SBW", "KRQ"]))
+    ['PYT', 'HON']
+    """
+    for chunk in chunks:
+        yield decrypt_caesar(chunk, shift)
+
+
+def _normalize_word(word: str) -> str:
+    """
+    Shifts a lowercase word so that it starts with "a".
+    Two words have the same normal form iff one is a Caesar shift of the other.
+    """
+    return word.translate(_str_table(-(ord(word[0]) - ord("a")) % 26))
 
 
-def caesar_breaker_brute_force(ciphertext: str, dictionary: tp.Set[str]) -> int:
+def build_word_index(dictionary: tp.Iterable[str]) -> tp.Dict[str, tp.FrozenSet[int]]:
+    """
+    Precomputes a shift-invariant index of the dictionary: every word is
+    mapped to its normal form, the value holds the offsets of the first
+    letters of the dictionary words sharing that form.
+
+    >>> index = build_word_index({"python", "java"})
+    >>> index[_normalize_word("sbwkrq")] == frozenset({ord("p") - ord("a")})
+    True
+    """
+    index: tp.Dict[str, tp.Set[int]] = {}
+    for word in dictionary:
+        word = word.lower()
+        if not word.isascii() or not word.isalpha():
+            continue
+        index.setdefault(_normalize_word(word), set()).add(ord(word[0]) - ord("a"))
+    return {key: frozenset(value) for key, value in index.items()}
+
+
+def _chi_squared(counts: tp.Sequence[int], shift: int) -> float:
+    total = sum(counts)
+    if total == 0:
+        return 0.0
+    chi = 0.0
+    for i, expected in enumerate(ENGLISH_FREQUENCIES):
+        expected *= total
+        observed = counts[(i + shift) % 26]
+        chi += (observed - expected) ** 2 / expected
+    return chi
+
+
+def caesar_breaker_brute_force(
+    ciphertext: str,
+    dictionary: tp.Set[str],
+    index: tp.Optional[tp.Dict[str, tp.FrozenSet[int]]] = None,
+) -> int:
     """
     Brute force breaking a Caesar cipher.
+
+    Every shift is scored by the number of ciphertext words which decrypt
+    to a dictionary word, ties are broken by the chi-squared distance between
+    the decrypted letter frequencies and the English ones. Pass a prebuilt
+    index from build_word_index to break many messages with one dictionary.
+
+    >>> caesar_breaker_brute_force("sbwkrq", {"python", "java", "ruby"})
+    3
+    >>> caesar_breaker_brute_force("Ghihqg wkh hdvw zdoo ri wkh fdvwoh", set())
+    3
     """
+    if index is None:
+        index = build_word_index(dictionary)
+
+    text = ciphertext.lower()
+    words = _WORD_RE.findall(text)
+    votes = [0] * 26
+    for word in words:
+        offsets = index.get(_normalize_word(word))
+        if offsets:
+            first = ord(word[0]) - ord("a")
+            for offset in offsets:
+                votes[(first - offset) % 26] += 1
+
+    counts = [text.count(letter) for letter in string.ascii_lowercase]
     best_shift = 0
-    # PUT YOUR CODE HERE
+    best_score = (votes[0], -_chi_squared(counts, 0))
+    for shift in range(1, 26):
+        score = (votes[shift], -_chi_squared(counts, shift))
+        if score > best_score:
+            best_shift, best_score = shift, score
     return best_shift
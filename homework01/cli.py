@@ -0,0 +1,116 @@
+import argparse
+import io
+import sys
+import typing as tp
+
+from caesar import decrypt_caesar_stream, encrypt_caesar_stream
+from vigenere import decrypt_vigenere_stream, encrypt_vigenere_stream
+
+CHUNK_SIZE = 1 << 20
+
+
+def open_text(mode: str) -> tp.Callable[[str], tp.TextIO]:
+    """
+    Argument type for --input and --output: "-" is stdin or stdout. Line
+    endings are kept as they are, and bytes that are not valid UTF-8 pass
+    through as lone surrogates, so a round trip gives back the same bytes.
+    """
+
+    def open_file(path: str) -> tp.TextIO:
+        if path == "-":
+            stream = tp.cast(io.TextIOWrapper, sys.stdin if "r" in mode else sys.stdout)
+            stream.reconfigure(encoding="utf-8", errors="surrogateescape", newline="")
+            return stream
+        try:
+            return open(path, mode, encoding="utf-8", errors="surrogateescape", newline="")
+        except OSError as e:
+            raise argparse.ArgumentTypeError(f"can't open '{path}': {e}")
+
+    return open_file
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def read_chunks(f: tp.TextIO, chunk_size: int = CHUNK_SIZE) -> tp.Iterator[str]:
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def write_chunks(f: tp.TextIO, chunks: tp.Iterable[str]) -> None:
+    for chunk in chunks:
+        f.write(chunk)
+    f.flush()
+
+
+def cmd_caesar(args: argparse.Namespace) -> None:
+    chunks = read_chunks(args.input, args.chunk_size)
+    if args.decrypt:
+        write_chunks(args.output, decrypt_caesar_stream(chunks, args.shift))
+    else:
+        write_chunks(args.output, encrypt_caesar_stream(chunks, args.shift))
+
+
+def cmd_vigenere(args: argparse.Namespace) -> None:
+    chunks = read_chunks(args.input, args.chunk_size)
+    if args.decrypt:
+        write_chunks(args.output, decrypt_vigenere_stream(chunks, args.keyword))
+    else:
+        write_chunks(args.output, encrypt_vigenere_stream(chunks, args.keyword))
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Encrypt or decrypt a file chunk by chunk.")
+    subparsers = parser.add_subparsers(title="ciphers", dest="cipher", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-d", "--decrypt", action="store_true", help="Decrypt instead of encrypt")
+    common.add_argument(
+        "-i",
+        "--input",
+        type=open_text("r"),
+        default="-",
+        help="Input file (stdin by default)",
+    )
+    common.add_argument(
+        "-o",
+        "--output",
+        type=open_text("w"),
+        default="-",
+        help="Output file (stdout by default)",
+    )
+    common.add_argument(
+        "--chunk-size", type=positive_int, default=CHUNK_SIZE, help="Number of characters per chunk"
+    )
+
+    caesar_parser = subparsers.add_parser("caesar", parents=[common], help="Caesar cipher")
+    caesar_parser.add_argument("-s", "--shift", type=int, default=3, help="Shift")
+    caesar_parser.set_defaults(func=cmd_caesar)
+
+    vigenere_parser = subparsers.add_parser("vigenere", parents=[common], help="Vigenere cipher")
+    vigenere_parser.add_argument("-k", "--keyword", required=True, help="Keyword")
+    vigenere_parser.set_defaults(func=cmd_vigenere)
+
+    return parser
+
+
+def main(argv: tp.Optional[tp.Sequence[str]] = None) -> None:
+    parser = make_parser()
+    args = parser.parse_args(argv)
+    try:
+        args.func(args)
+    finally:
+        for f in (args.input, args.output):
+            if f not in (sys.stdin, sys.stdout):
+                f.close()
+
+
+if __name__ == "__main__":
+    main()
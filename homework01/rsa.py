@@ -1,11 +1,76 @@
+import functools
 import random
+import secrets
 import typing as tp
+from concurrent.futures import ProcessPoolExecutor
 
 
-def is_prime(n: int) -> bool:
+class PrivateKey(tp.NamedTuple):
+    """
+    Private key with the precomputed values for CRT decryption.
+    """
+
+    d: int
+    n: int
+    p: int
+    q: int
+    dp: int
+    dq: int
+    qinv: int
+
+
+Key = tp.Union[tp.Tuple[int, int], PrivateKey]
+
+
+def _sieve(limit: int) -> tp.List[int]:
+    """
+    Sieve of Eratosthenes.
+
+    >>> _sieve(20)
+    [2, 3, 5, 7, 11, 13, 17, 19]
+    """
+    is_composite = bytearray(limit + 1)
+    primes = []
+    for i in range(2, limit + 1):
+        if not is_composite[i]:
+            primes.append(i)
+            is_composite[i * i :: i] = b"\x01" * len(range(i * i, limit + 1, i))
+    return primes
+
+
+SMALL_PRIMES = _sieve(2000)
+# Miller-Rabin with the first 13 primes as bases is exact below this bound.
+_DETERMINISTIC_BOUND = 3317044064679887385961981
+_DETERMINISTIC_BASES = SMALL_PRIMES[:13]
+
+
+def _miller_rabin(n: int, bases: tp.Iterable[int]) -> bool:
+    d = n - 1
+    s = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in bases:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = pow(x, 2, n)
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def is_prime(n: int, rounds: int = 20) -> bool:
     """
     Tests to see if a number is prime.
 
+    Small divisors are ruled out by trial division, the rest is checked
+    by the Miller-Rabin test: deterministic below 3.3 * 10^24, with
+    extra random bases for larger numbers.
+
     >>> is_prime(2)
     True
     >>> is_prime(11)
@@ -13,15 +78,17 @@ def is_prime(n: int) -> bool:
     >>> is_prime(8)
     False
     """
-    k = 2
-    if n == 0 or n == 1:
+    if n < 2:
         return False
-    while k <= n ** 0.5:
-        if n % k != 0:
-            k += 1
-        if n % k == 0:
-            return False
-    return True
+    for p in SMALL_PRIMES:
+        if n % p == 0:
+            return n == p
+    if n < SMALL_PRIMES[-1] ** 2:
+        return True
+    if n < _DETERMINISTIC_BOUND:
+        return _miller_rabin(n, _DETERMINISTIC_BASES)
+    bases = _DETERMINISTIC_BASES + [secrets.randbelow(n - 3) + 2 for _ in range(rounds)]
+    return _miller_rabin(n, bases)
 
 
 def gcd(a: int, b: int) -> int:
@@ -33,13 +100,8 @@ def gcd(a: int, b: int) -> int:
     >>> gcd(3, 7)
     1
     """
-    if a == 0 or b == 0:
-        return max(a, b)
-    while (a - b) != 0:
-        if a > b:
-            a -= b
-        else:
-            b -= a
+    while b:
+        a, b = b, a % b
     return a
 
 
@@ -93,25 +155,166 @@ def generate_keypair(
     return ((e, n), (d, n))
 
 
-def encrypt(pk: tp.Tuple[int, int], plaintext: str) -> tp.List[int]:
-    # Unpack the key into it's components
+def generate_prime(bits: int) -> int:
+    """
+    Generates a random prime number of exactly the given bit length.
+    The two highest bits are set, so the product of two such primes
+    has exactly twice as many bits.
+    """
+    if bits < 2:
+        raise ValueError("A prime must have at least 2 bits.")
+    while True:
+        candidate = secrets.randbits(bits) | (1 << (bits - 1)) | (1 << max(bits - 2, 0)) | 1
+        if is_prime(candidate):
+            return candidate
+
+
+def generate_large_keypair(
+    bits: int = 2048, e: int = 65537
+) -> tp.Tuple[tp.Tuple[int, int], PrivateKey]:
+    """
+    Generates a keypair with a modulus of the given bit length
+    from two random primes and a fixed public exponent.
+    """
+    # Below 16 bits there may be only one prime of each half's length
+    if bits < 16:
+        raise ValueError("The modulus must have at least 16 bits.")
+    while True:
+        p = generate_prime(bits // 2)
+        q = generate_prime(bits - bits // 2)
+        phi = (p - 1) * (q - 1)
+        if p != q and gcd(e, phi) == 1:
+            break
+    d = multiplicative_inverse(e, phi)
+    n = p * q
+    private = PrivateKey(d, n, p, q, d % (p - 1), d % (q - 1), multiplicative_inverse(q, p))
+    return ((e, n), private)
+
+
+def _power(char: int, pk: Key) -> int:
+    """
+    Computes char^key mod n, using the Chinese remainder theorem
+    when the key carries the factorization of n.
+    """
+    if isinstance(pk, PrivateKey):
+        m1 = pow(char, pk.dp, pk.p)
+        m2 = pow(char, pk.dq, pk.q)
+        h = pk.qinv * (m1 - m2) % pk.p
+        return m2 + h * pk.q
     key, n = pk
+    return pow(char, key, n)
+
+
+def encrypt(pk: Key, plaintext: str) -> tp.List[int]:
     # Convert each letter in the plaintext to numbers based on
     # the character using a^b mod m
-    cipher = [(ord(char) ** key) % n for char in plaintext]
+    cipher = [_power(ord(char), pk) for char in plaintext]
     # Return the array of bytes
     return cipher
 
 
-def decrypt(pk: tp.Tuple[int, int], ciphertext: tp.List[int]) -> str:
-    # Unpack the key into its components
-    key, n = pk
+def decrypt(pk: Key, ciphertext: tp.List[int]) -> str:
     # Generate the plaintext based on the ciphertext and key using a^b mod m
-    plain = [chr((char ** key) % n) for char in ciphertext]
+    plain = [chr(_power(char, pk)) for char in ciphertext]
     # Return the array of bytes as a string
     return "".join(plain)
 
 
+def _block_size(n: int) -> int:
+    """
+    Number of plaintext bytes that always fit into an integer below n.
+    """
+    size = (n.bit_length() - 1) // 8
+    if size < 1:
+        raise ValueError("The modulus is too small for block encryption.")
+    return size
+
+
+def encrypt_blocks(pk: Key, plaintext: str) -> tp.List[int]:
+    """
+    Encrypts the UTF-8 bytes of plaintext packed into blocks
+    just under the modulus size, one exponentiation per block.
+    The message is padded with 0x01 followed by zero bytes.
+    """
+    size = _block_size(pk[1])
+    data = plaintext.encode("utf-8") + b"\x01"
+    data += bytes(-len(data) % size)
+    return [
+        _power(int.from_bytes(data[i : i + size], "big"), pk) for i in range(0, len(data), size)
+    ]
+
+
+def decrypt_blocks(pk: Key, ciphertext: tp.List[int]) -> str:
+    """
+    Decrypts a message encrypted by encrypt_blocks.
+    """
+    size = _block_size(pk[1])
+    data = b"".join(_power(block, pk).to_bytes(size, "big") for block in ciphertext)
+    data = data.rstrip(b"\x00")
+    if not data.endswith(b"\x01"):
+        raise ValueError("Invalid padding.")
+    return data[:-1].decode("utf-8")
+
+
+def blocks_to_bytes(pk: Key, blocks: tp.List[int]) -> bytes:
+    """
+    Serializes ciphertext blocks as fixed width big-endian integers.
+
+    >>> blocks_to_bytes((7, 323), [1, 300])
+    b'\\x00\\x01\\x01,'
+    """
+    width = (pk[1].bit_length() + 7) // 8
+    return b"".join(block.to_bytes(width, "big") for block in blocks)
+
+
+def blocks_from_bytes(pk: Key, data: bytes) -> tp.List[int]:
+    """
+    Deserializes ciphertext blocks written by blocks_to_bytes.
+
+    >>> blocks_from_bytes((7, 323), b'\\x00\\x01\\x01,')
+    [1, 300]
+    """
+    width = (pk[1].bit_length() + 7) // 8
+    if len(data) % width:
+        raise ValueError("Truncated ciphertext.")
+    return [int.from_bytes(data[i : i + width], "big") for i in range(0, len(data), width)]
+
+
+def _map(
+    func: tp.Callable[[tp.Any], tp.Any],
+    items: tp.Iterable[tp.Any],
+    workers: tp.Optional[int],
+    chunksize: int,
+) -> tp.List[tp.Any]:
+    if workers == 1:
+        return list(map(func, items))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, items, chunksize=chunksize))
+
+
+def encrypt_many(
+    pk: Key, messages: tp.Iterable[str], workers: tp.Optional[int] = None, chunksize: int = 64
+) -> tp.List[tp.List[int]]:
+    """
+    Encrypts every message with encrypt, distributing the messages over
+    a pool of worker processes in chunks. workers=None uses all CPUs,
+    workers=1 encrypts in the current process.
+    """
+    return _map(functools.partial(encrypt, pk), messages, workers, chunksize)
+
+
+def decrypt_many(
+    pk: Key,
+    ciphertexts: tp.Iterable[tp.List[int]],
+    workers: tp.Optional[int] = None,
+    chunksize: int = 64,
+) -> tp.List[str]:
+    """
+    Decrypts every ciphertext with decrypt in a pool of worker processes.
+    """
+    return _map(functools.partial(decrypt, pk), ciphertexts, workers, chunksize)
+
+
 if __name__ == "__main__":
     print("RSA Encrypter/ Decrypter")
     p = int(input("Enter a prime number (17, 19, 23, etc): "))
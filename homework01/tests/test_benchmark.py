@@ -0,0 +1,38 @@
+import json
+import unittest
+from unittest import mock
+
+import benchmark
+
+
+class BenchmarkTestCase(unittest.TestCase):
+    def test_bench_ciphers(self):
+        results = benchmark.bench_ciphers(
+            [1024], ["caesar", "vigenere", "rsa"], repeat=1, rsa_bits=256
+        )
+        self.assertEqual(7, len(results))
+        operations = {(result["cipher"], result["operation"]) for result in results}
+        self.assertIn(("vigenere", "break"), operations)
+        for result in results:
+            self.assertEqual(1024, result["size"])
+            self.assertGreater(result["mb_per_sec"], 0)
+
+    def test_instant_run_is_valid_json(self):
+        with mock.patch.object(benchmark, "_best_time", return_value=0.0):
+            results = benchmark.bench_ciphers([1024], ["caesar"], repeat=1)
+        json.dumps(results, allow_nan=False)
+
+    def test_find_regressions(self):
+        baseline = [
+            {"cipher": "caesar", "operation": "encrypt", "size": 1024, "mb_per_sec": 100.0},
+            {"cipher": "rsa", "operation": "decrypt", "size": 1024, "mb_per_sec": 1.0},
+        ]
+        results = [
+            {"cipher": "caesar", "operation": "encrypt", "size": 1024, "mb_per_sec": 85.0},
+            {"cipher": "rsa", "operation": "decrypt", "size": 1024, "mb_per_sec": 0.5},
+            {"cipher": "vigenere", "operation": "encrypt", "size": 1024, "mb_per_sec": 0.1},
+        ]
+        regressions = benchmark.find_regressions(results, baseline, threshold=0.2)
+        self.assertEqual(1, len(regressions))
+        self.assertTrue(regressions[0].startswith("rsa decrypt 1024"))
+        self.assertEqual(2, len(benchmark.find_regressions(results, baseline, threshold=0.1)))
@@ -51,3 +51,25 @@ class CaesarTestCase(unittest.TestCase):
             caesar.decrypt_caesar(ciphertext, shift=shift),
             msg=f"shift={shift}, ciphertext={ciphertext}",
         )
+
+    def test_bytes_roundtrip(self):
+        data = bytes(range(256)) * 4
+        for shift in (0, 3, 13, 25, 26, 29, -1):
+            with self.subTest(shift=shift):
+                ciphertext = caesar.encrypt_caesar_bytes(data, shift=shift)
+                self.assertEqual(
+                    caesar.encrypt_caesar(data.decode("latin-1"), shift=shift),
+                    ciphertext.decode("latin-1"),
+                )
+                self.assertEqual(data, caesar.decrypt_caesar_bytes(ciphertext, shift=shift))
+
+    def test_caesar_breaker_brute_force(self):
+        dictionary = {"python", "java", "ruby", "go", "rust", "is", "fun"}
+        index = caesar.build_word_index(dictionary)
+        for shift in range(26):
+            ciphertext = caesar.encrypt_caesar("Python is fun", shift=shift)
+            with self.subTest(shift=shift):
+                self.assertEqual(shift, caesar.caesar_breaker_brute_force(ciphertext, dictionary))
+                self.assertEqual(
+                    shift, caesar.caesar_breaker_brute_force(ciphertext, set(), index=index)
+                )
@@ -0,0 +1,31 @@
+import contextlib
+import io
+import pathlib
+import tempfile
+import unittest
+
+import cli
+
+
+class CliTestCase(unittest.TestCase):
+    def test_round_trip_keeps_bytes(self):
+        data = "Hello\r\nWorld café мир\r\n".encode() + b"\xe9\xff\r\n"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = pathlib.Path(tmpdir)
+            (tmp / "in.txt").write_bytes(data)
+            for args in (["caesar", "-s", "5"], ["vigenere", "-k", "LEMON"]):
+                with self.subTest(args=args):
+                    cli.main(args + ["-i", str(tmp / "in.txt"), "-o", str(tmp / "enc.txt")])
+                    cli.main(
+                        args
+                        + ["-d", "-i", str(tmp / "enc.txt"), "-o", str(tmp / "dec.txt")]
+                        + ["--chunk-size", "3"]
+                    )
+                    self.assertNotEqual(data, (tmp / "enc.txt").read_bytes())
+                    self.assertEqual(data, (tmp / "dec.txt").read_bytes())
+
+    def test_rejects_empty_chunks(self):
+        for size in ("0", "-1"):
+            with self.subTest(size=size), contextlib.redirect_stderr(io.StringIO()):
+                with self.assertRaises(SystemExit):
+                    cli.main(["caesar", "--chunk-size", size])
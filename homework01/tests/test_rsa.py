@@ -15,6 +15,9 @@ class RSATestCase(unittest.TestCase):
         self.assertTrue(rsa.is_prime(7))
         self.assertFalse(rsa.is_prime(8))
         self.assertTrue(rsa.is_prime(3571))
+        self.assertFalse(rsa.is_prime(3215031751))
+        self.assertTrue(rsa.is_prime(2 ** 127 - 1))
+        self.assertFalse(rsa.is_prime((2 ** 61 - 1) * (2 ** 89 - 1)))
 
     def test_gcd(self):
         self.assertEqual(0, rsa.gcd(0, 0))
@@ -42,3 +45,49 @@ class RSATestCase(unittest.TestCase):
         self.assertEqual(
             ((9678731, 11188147), (1804547, 11188147)), rsa.generate_keypair(3259, 3433)
         )
+
+    def test_generate_large_keypair(self):
+        (e, n), private = rsa.generate_large_keypair(512)
+        self.assertEqual(n, private.n)
+        self.assertEqual(512, n.bit_length())
+        for m in (0, 1, 42, n - 1):
+            self.assertEqual(m, pow(pow(m, e, n), private.d, n))
+
+        (e, n), private = rsa.generate_large_keypair(16)
+        self.assertEqual(16, n.bit_length())
+        for bits in (2, 8, 15):
+            with self.assertRaises(ValueError):
+                rsa.generate_large_keypair(bits)
+
+    def test_encrypt_decrypt(self):
+        public, private = rsa.generate_large_keypair(512)
+        message = "Hello, мир!"
+        ciphertext = rsa.encrypt(public, message)
+        self.assertEqual(message, rsa.decrypt(private, ciphertext))
+        self.assertEqual(message, rsa.decrypt(private[:2], ciphertext))
+        self.assertEqual(message, rsa.decrypt(public, rsa.encrypt(private, message)))
+
+        public, private = rsa.generate_keypair(17, 19)
+        self.assertEqual("Hi", rsa.decrypt(private, rsa.encrypt(public, "Hi")))
+
+    def test_encrypt_decrypt_blocks(self):
+        public, private = rsa.generate_large_keypair(512)
+        for message in ("", "Hi", "Hello, мир!" * 20, "\x00\x01" * 63):
+            with self.subTest(message=message):
+                ciphertext = rsa.encrypt_blocks(public, message)
+                self.assertEqual(len(message.encode("utf-8")) // 63 + 1, len(ciphertext))
+                data = rsa.blocks_to_bytes(public, ciphertext)
+                self.assertEqual(64 * len(ciphertext), len(data))
+                self.assertEqual(ciphertext, rsa.blocks_from_bytes(private, data))
+                self.assertEqual(message, rsa.decrypt_blocks(private, ciphertext))
+
+        public, private = rsa.generate_keypair(17, 19)
+        self.assertEqual("Hi", rsa.decrypt_blocks(private, rsa.encrypt_blocks(public, "Hi")))
+
+    def test_encrypt_decrypt_many(self):
+        public, private = rsa.generate_large_keypair(256)
+        messages = [f"message {i}" for i in range(50)]
+        ciphertexts = rsa.encrypt_many(public, messages, workers=2, chunksize=8)
+        self.assertEqual([rsa.encrypt(public, m) for m in messages], ciphertexts)
+        self.assertEqual(messages, rsa.decrypt_many(private, ciphertexts, workers=2, chunksize=8))
+        self.assertEqual(messages, rsa.decrypt_many(private, ciphertexts, workers=1))
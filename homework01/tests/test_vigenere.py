@@ -1,6 +1,7 @@
 import random
 import string
 import unittest
+from unittest import mock
 
 import vigenere
 
@@ -40,3 +41,68 @@ class VigenereTestCase(unittest.TestCase):
         plaintext = ''.join(random.choice(string.ascii_letters + ' -,') for _ in range(64))
         ciphertext = vigenere.encrypt_vigenere(plaintext, keyword)
         self.assertEqual(plaintext, vigenere.decrypt_vigenere(ciphertext, keyword))
+
+    def test_stream(self):
+        keyword = "LeMoN"
+        plaintext = "Attack at dawn, then retreat to the hills! " * 7
+        expected = vigenere.encrypt_vigenere(plaintext, keyword)
+        for size in (1, 2, 5, 13, len(plaintext)):
+            chunks = [plaintext[i : i + size] for i in range(0, len(plaintext), size)]
+            with self.subTest(size=size):
+                ciphertext = "".join(vigenere.encrypt_vigenere_stream(chunks, keyword))
+                self.assertEqual(expected, ciphertext)
+                chunks = [ciphertext[i : i + size] for i in range(0, len(ciphertext), size)]
+                self.assertEqual(
+                    plaintext, "".join(vigenere.decrypt_vigenere_stream(chunks, keyword))
+                )
+
+    def test_break_vigenere(self):
+        plaintext = (
+            "It was the best of times, it was the worst of times, it was the age of wisdom, "
+            "it was the age of foolishness, it was the epoch of belief, it was the epoch of "
+            "incredulity, it was the season of Light, it was the season of Darkness, it was "
+            "the spring of hope, it was the winter of despair, we had everything before us, "
+            "we had nothing before us, we were all going direct to Heaven, we were all going "
+            "direct the other way - in short, the period was so far like the present period, "
+            "that some of its noisiest authorities insisted on its being received, for good "
+            "or for evil, in the superlative degree of comparison only. There were a king "
+            "with a large jaw and a queen with a plain face, on the throne of England; there "
+            "were a king with a large jaw and a queen with a fair face, on the throne of "
+            "France. In both countries it was clearer than crystal to the lords of the State "
+            "preserves of loaves and fishes, that things in general were settled for ever."
+        )
+        for keyword in ("LEMON", "python", "Cipher"):
+            with self.subTest(keyword=keyword):
+                ciphertext = vigenere.encrypt_vigenere(plaintext, keyword)
+                self.assertEqual(len(keyword), vigenere.estimate_key_length(ciphertext))
+                recovered = vigenere.break_vigenere(ciphertext)
+                self.assertEqual(plaintext, vigenere.decrypt_vigenere(ciphertext, recovered))
+
+    def test_empty_keyword(self):
+        for text in ("python", "python" * 1000):
+            with self.subTest(length=len(text)):
+                with self.assertRaises(ValueError):
+                    vigenere.encrypt_vigenere(text, "")
+                with self.assertRaises(ValueError):
+                    vigenere.decrypt_vigenere(text, "")
+
+    @unittest.skipIf(vigenere.np is None, "NumPy is not installed")
+    def test_numpy_backend(self):
+        # "\ud800" is a lone surrogate, it must pass through unchanged
+        alphabet = string.ascii_letters + string.digits + " -,\néя\U0001f40d\ud800"
+        plaintext = "".join(random.choice(alphabet) for _ in range(10000))
+        for keyword, block in (("A", 4096), ("LEMON", 1000), ("lsci", 65536), ("MiXeD", 999)):
+            for offset in (0, 3):
+                with self.subTest(keyword=keyword, offset=offset), mock.patch.object(
+                    vigenere, "_NUMPY_BLOCK", block
+                ):
+                    for sign in (1, -1):
+                        self.assertEqual(
+                            vigenere._shift_vigenere_python(plaintext, keyword, sign, offset),
+                            vigenere._shift_vigenere_numpy(plaintext, keyword, sign, offset),
+                        )
+                    ascii_text = plaintext.encode("ascii", errors="ignore").decode("ascii")
+                    self.assertEqual(
+                        vigenere._shift_vigenere_python(ascii_text, keyword, 1, offset),
+                        vigenere._shift_vigenere_numpy(ascii_text, keyword, 1, offset),
+                    )
@@ -1,3 +1,103 @@
+import string
+import typing as tp
+
+from caesar import ENGLISH_FREQUENCIES
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+# Texts shorter than this are not worth the conversion to NumPy arrays.
+_NUMPY_THRESHOLD = 4096
+# Longer texts are shifted in blocks of this many characters, so that the
+# temporary arrays stay small.
+_NUMPY_BLOCK = 1 << 16
+
+# Uppercase letters are shifted by ord(k) - ord("A") and lowercase ones by
+# ord(k) - ord("a"), i.e. by 32 % 26 == 6 less. Moving lowercase letters 6
+# positions forward puts both cases into a single alphabet with a single
+# shift per keyword letter. Every other character becomes _NOT_LETTER.
+_NOT_LETTER = 26
+_LETTERS_TABLE = bytes(
+    ord(c) - ord("A")
+    if "A" <= c <= "Z"
+    else (ord(c) - ord("a") + 6) % 26
+    if "a" <= c <= "z"
+    else _NOT_LETTER
+    for c in map(chr, range(256))
+)
+_SAMPLE_SIZE = 100_000
+
+
+def _shift_vigenere(text: str, keyword: str, sign: int, offset: int = 0) -> str:
+    """
+    Shifts every letter of text by the matching keyword letter, starting
+    at position offset of the keyword.
+    """
+    if not keyword:
+        raise ValueError("The keyword must not be empty.")
+    if np is not None and len(text) >= _NUMPY_THRESHOLD:
+        return _shift_vigenere_numpy(text, keyword, sign, offset)
+    return _shift_vigenere_python(text, keyword, sign, offset)
+
+
+def _shift_vigenere_python(text: str, keyword: str, sign: int, offset: int = 0) -> str:
+    result = []
+    j = offset
+    klen = len(keyword)
+    for i in text:
+        if "A" <= i <= "Z":
+            shift = ord(keyword[j % klen]) - ord("A")
+            result.append(chr(ord("A") + (ord(i) - ord("A") + sign * shift) % 26))
+        elif "a" <= i <= "z":
+            shift = ord(keyword[j % klen]) - ord("a")
+            result.append(chr(ord("a") + (ord(i) - ord("a") + sign * shift) % 26))
+        else:
+            result.append(i)
+        j += 1
+    return "".join(result)
+
+
+def _shift_vigenere_numpy(text: str, keyword: str, sign: int, offset: int = 0) -> str:
+    """
+    Same as _shift_vigenere_python, but the text is shifted block by block.
+    Characters stay in the narrowest array type that holds them, uint8 for
+    ASCII text, and shifts are always added, as numbers from 0 to 25.
+    """
+    dtype: tp.Any
+    if text.isascii():
+        encoding, dtype = "ascii", np.uint8
+    else:
+        encoding, dtype = "utf-32-le", np.uint32
+    klen = len(keyword)
+    shifts = {
+        base: np.array([sign * (ord(k) - base) % 26 for k in keyword], dtype=dtype)
+        for base in (ord("A"), ord("a"))
+    }
+    # The key repeated over a block, plus one keyword length to start anywhere in it
+    size = min(len(text), _NUMPY_BLOCK)
+    keys = {base: np.tile(key, size // klen + 2) for base, key in shifts.items()}
+
+    parts = []
+    for start in range(0, len(text), _NUMPY_BLOCK):
+        chunk = text[start : start + _NUMPY_BLOCK]
+        # surrogatepass keeps lone surrogates, which the Python path passes through as is
+        codes = np.frombuffer(chunk.encode(encoding, "surrogatepass"), dtype=dtype)
+        phase = (offset + start) % klen
+        result = codes
+        for base, key in keys.items():
+            # Codes below base wrap around and are not letters either
+            letters = codes - dtype(base)
+            is_letter = letters < 26
+            letters += key[phase : phase + len(codes)]
+            letters[letters >= 26] -= dtype(26)
+            letters += dtype(base)
+            result = np.where(is_letter, letters, result)
+        parts.append(result.tobytes().decode(encoding, "surrogatepass"))
+    return "".join(parts)
+
+
 def encrypt_vigenere(plaintext: str, keyword: str) -> str:
     """
     Encrypts plaintext using a Vigenere cipher.
@@ -9,19 +109,7 @@ def encrypt_vigenere(plaintext: str, keyword: str) -> str:
     >>> encrypt_vigenere("ATTACKATDAWN", "LEMON")
     'LXFOPVEFRNHR'
     """
-    ciphertext = ""
-    j = 0
-    for i in plaintext:
-        if ord("A") <= ord(i) <= ord("Z"):
-            shift = ord(keyword[j % len(keyword)]) - ord("A")
-            ciphertext += chr(ord("A") + (ord(i) - ord("A") + shift) % 26)
-        elif ord("a") <= ord(i) <= ord("z"):
-            shift = ord(keyword[j % len(keyword)]) - ord("a")
-            ciphertext += chr(ord("a") + (ord(i) - ord("a") + shift) % 26)
-        else:
-            ciphertext += i
-        j += 1
-    return ciphertext
+    return _shift_vigenere(plaintext, keyword, 1)
 
 
 def decrypt_vigenere(ciphertext: str, keyword: str) -> str:
@@ -35,16 +123,112 @@ def decrypt_vigenere(ciphertext: str, keyword: str) -> str:
     >>> decrypt_vigenere("LXFOPVEFRNHR", "LEMON")
     'ATTACKATDAWN'
     """
-    plaintext = ""
-    j = 0
-    for i in ciphertext:
-        if ord("A") <= ord(i) <= ord("Z"):
-            shift = ord(keyword[j % len(keyword)]) - ord("A")
-            plaintext += chr(ord("A") + (ord(i) - ord("A") - shift) % 26)
-        elif ord("a") <= ord(i) <= ord("z"):
-            shift = ord(keyword[j % len(keyword)]) - ord("a")
-            plaintext += chr(ord("a") + (ord(i) - ord("a") - shift) % 26)
-        else:
-            plaintext += i
-        j += 1
-    return plaintext
+    return _shift_vigenere(ciphertext, keyword, -1)
+
+
+def _stream_vigenere(chunks: tp.Iterable[str], keyword: str, sign: int) -> tp.Iterator[str]:
+    offset = 0
+    for chunk in chunks:
+        yield _shift_vigenere(chunk, keyword, sign, offset)
+        offset = (offset + len(chunk)) % len(keyword)
+
+
+def encrypt_vigenere_stream(chunks: tp.Iterable[str], keyword: str) -> tp.Iterator[str]:
+    """
+    Encrypts a stream of text chunks using a Vigenere cipher.
+    The keyword position is carried over chunk boundaries.
+
+    >>> "".join(encrypt_vigenere_stream(["ATTA", "CKA", "TDAWN"], "LEMON"))
+    'LXFOPVEFRNHR'
+    """
+    return _stream_vigenere(chunks, keyword, 1)
+
+
+def decrypt_vigenere_stream(chunks: tp.Iterable[str], keyword: str) -> tp.Iterator[str]:
+    """
+    Decrypts a stream of text chunks using a Vigenere cipher.
+
+    >>> "".join(decrypt_vigenere_stream(["LXFOPV", "EFRNHR"], "LEMON"))
+    'ATTACKATDAWN'
+    """
+    return _stream_vigenere(chunks, keyword, -1)
+
+
+def _letter_codes(text: str) -> bytes:
+    """
+    Maps every character to the index of its letter in the common alphabet,
+    keeping one byte per character so that keyword positions are preserved.
+    """
+    return text.encode("latin-1", errors="replace").translate(_LETTERS_TABLE)
+
+
+def _letter_counts(codes: bytes) -> tp.List[int]:
+    return [codes.count(i) for i in range(26)]
+
+
+def index_of_coincidence(counts: tp.Sequence[int]) -> float:
+    """
+    Probability that two letters drawn from a text are the same.
+
+    >>> index_of_coincidence([2, 2])
+    0.3333333333333333
+    """
+    total = sum(counts)
+    if total < 2:
+        return 0.0
+    return sum(n * (n - 1) for n in counts) / (total * (total - 1))
+
+
+def estimate_key_length(ciphertext: str, max_length: int = 40) -> int:
+    """
+    Estimates the keyword length of a Vigenere ciphertext.
+
+    For every candidate period the text is split into columns and the average
+    index of coincidence of the columns is computed. The shortest period whose
+    index is close to the best one wins, so that multiples of the real
+    period are not preferred.
+    """
+    codes = _letter_codes(ciphertext[:_SAMPLE_SIZE])
+    scores = []
+    for length in range(1, max_length + 1):
+        iocs = [index_of_coincidence(_letter_counts(codes[i::length])) for i in range(length)]
+        scores.append(sum(iocs) / length)
+    best = max(scores)
+    for length, score in enumerate(scores, start=1):
+        if score >= 0.9 * best:
+            return length
+    return 1
+
+
+def _column_shift(counts: tp.Sequence[int]) -> int:
+    total = sum(counts)
+    if total == 0:
+        return 0
+    best_shift, best_chi = 0, float("inf")
+    for shift in range(26):
+        chi = 0.0
+        for i, frequency in enumerate(ENGLISH_FREQUENCIES):
+            expected = frequency * total
+            chi += (counts[(i + shift) % 26] - expected) ** 2 / expected
+        if chi < best_chi:
+            best_shift, best_chi = shift, chi
+    return best_shift
+
+
+def break_vigenere(
+    ciphertext: str, key_length: tp.Optional[int] = None, max_length: int = 40
+) -> str:
+    """
+    Recovers the keyword of a Vigenere ciphertext.
+
+    Each keyword letter is found by the chi-squared frequency analysis of
+    its column. The keyword is returned in uppercase, which decrypts the
+    ciphertext exactly as the original keyword did.
+    """
+    if key_length is None:
+        key_length = estimate_key_length(ciphertext, max_length)
+    codes = _letter_codes(ciphertext)
+    return "".join(
+        chr(ord("A") + _column_shift(_letter_counts(codes[i::key_length])))
+        for i in range(key_length)
+    )
@@ -0,0 +1,155 @@
+import typing as tp
+
+
+class DancingLinks:
+    """
+    Алгоритм X Кнута для задачи точного покрытия на танцующих ссылках.
+    Узлы хранятся в параллельных списках: 0 - корень, 1..n_columns - заголовки
+    столбцов, дальше узлы строк.
+
+    >>> dlx = DancingLinks(4, [[0, 1], [2, 3], [1, 2], [0], [3]])
+    >>> sorted(sorted(solution) for solution in dlx.solutions())
+    [[0, 1], [2, 3, 4]]
+    """
+
+    def __init__(self, n_columns: int, rows: tp.Sequence[tp.Sequence[int]]) -> None:
+        n = n_columns + 1
+        self.left = [i - 1 for i in range(n)]
+        self.right = [i + 1 for i in range(n)]
+        self.left[0], self.right[-1] = n_columns, 0
+        self.up = list(range(n))
+        self.down = list(range(n))
+        self.column = list(range(n))
+        self.row = [-1] * n
+        self.size = [0] * n
+        self.first: tp.List[int] = []
+        # Статистика перебора: испробованные строки, откаты и наибольшая глубина
+        self.nodes = self.backtracks = self.max_depth = 0
+
+        for row_id, columns in enumerate(rows):
+            first = -1
+            for c in columns:
+                c += 1
+                node = len(self.column)
+                self.column.append(c)
+                self.row.append(row_id)
+                self.up.append(self.up[c])
+                self.down.append(c)
+                self.down[self.up[c]] = node
+                self.up[c] = node
+                self.size[c] += 1
+                if first < 0:
+                    first = node
+                    self.left.append(node)
+                    self.right.append(node)
+                else:
+                    self.left.append(self.left[first])
+                    self.right.append(first)
+                    self.right[self.left[first]] = node
+                    self.left[first] = node
+            self.first.append(first)
+
+    def cover(self, c: int) -> None:
+        left, right, up, down, column, size = (
+            self.left,
+            self.right,
+            self.up,
+            self.down,
+            self.column,
+            self.size,
+        )
+        right[left[c]] = right[c]
+        left[right[c]] = left[c]
+        i = down[c]
+        while i != c:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self, c: int) -> None:
+        left, right, up, down, column, size = (
+            self.left,
+            self.right,
+            self.up,
+            self.down,
+            self.column,
+            self.size,
+        )
+        i = up[c]
+        while i != c:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[c]] = c
+        left[right[c]] = c
+
+    def select(self, row_id: int) -> bool:
+        """
+        Заранее включает строку в покрытие. Возвращает False,
+        если какой-то ее столбец уже покрыт.
+        """
+        first = self.first[row_id]
+        node = first
+        while True:
+            c = self.column[node]
+            if self.right[self.left[c]] != c:
+                return False
+            node = self.right[node]
+            if node == first:
+                break
+        while True:
+            self.cover(self.column[node])
+            node = self.right[node]
+            if node == first:
+                return True
+
+    def solutions(self) -> tp.Iterator[tp.List[int]]:
+        """Перечисляет все покрытия оставшихся столбцов списками номеров строк"""
+        right, left, down, column, size = self.right, self.left, self.down, self.column, self.size
+        chosen: tp.List[int] = []
+        while True:
+            # Выбираем столбец с наименьшим числом строк
+            if right[0] == 0:
+                yield [self.row[node] for node in chosen]
+                node = -1
+            else:
+                c, best = right[0], size[right[0]] + 1
+                j = c
+                while j != 0:
+                    if size[j] < best:
+                        c, best = j, size[j]
+                    j = right[j]
+                self.cover(c)
+                node = down[c]
+
+            # Пробуем очередную строку, при неудаче откатываемся на уровень выше
+            while True:
+                if node >= 0 and node != column[node]:
+                    chosen.append(node)
+                    self.nodes += 1
+                    if len(chosen) > self.max_depth:
+                        self.max_depth = len(chosen)
+                    j = right[node]
+                    while j != node:
+                        self.cover(column[j])
+                        j = right[j]
+                    break
+                if node >= 0:
+                    self.uncover(node)
+                if not chosen:
+                    return
+                node = chosen.pop()
+                self.backtracks += 1
+                j = left[node]
+                while j != node:
+                    self.uncover(column[j])
+                    j = left[j]
+                node = down[node]
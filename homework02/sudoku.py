@@ -1,35 +1,74 @@
+import argparse
+import collections
+import functools
+import itertools
+import math
+import operator
+import os
 import pathlib
 import random
+import time
 import typing as tp
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from dlx import DancingLinks
 
 T = tp.TypeVar("T")
 
+# Символы для сеток до 35x35: сначала цифры, потом латинские буквы
+SYMBOLS = "123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def default_alphabet(size: int) -> str:
+    """Алфавит по умолчанию для сетки size x size
+
+    >>> default_alphabet(9)
+    '123456789'
+    >>> default_alphabet(16)
+    '123456789ABCDEFG'
+    """
+    if size > len(SYMBOLS):
+        raise ValueError(f"No default alphabet for size {size}")
+    return SYMBOLS[:size]
 
-def read_sudoku(path: tp.Union[str, pathlib.Path]) -> tp.List[tp.List[str]]:
+
+def read_sudoku(
+    path: tp.Union[str, pathlib.Path], alphabet: tp.Optional[str] = None
+) -> tp.List[tp.List[str]]:
     """ Прочитать Судоку из указанного файла """
     path = pathlib.Path(path)
     with path.open() as f:
         puzzle = f.read()
-    return create_grid(puzzle)
+    return create_grid(puzzle, alphabet)
 
 
-def create_grid(puzzle: str) -> tp.List[tp.List[str]]:
-    digits = [c for c in puzzle if c in "123456789."]
-    grid = group(digits, 9)
+def create_grid(puzzle: str, alphabet: tp.Optional[str] = None) -> tp.List[tp.List[str]]:
+    if alphabet is None:
+        # Размер сетки - по числу клеток, записанных символами SYMBOLS или "."
+        cells = sum(1 for c in puzzle if c in SYMBOLS or c == ".")
+        if not cells:
+            return []
+        alphabet = default_alphabet(math.isqrt(cells))
+    digits = [c for c in puzzle if c in alphabet + "."]
+    grid = group(digits, len(alphabet))
     return grid
 
 
 def display(grid: tp.List[tp.List[str]]) -> None:
     """Вывод Судоку """
+    size = len(grid)
+    box = math.isqrt(size)
     width = 2
-    line = "+".join(["-" * (width * 3)] * 3)
-    for row in range(9):
+    line = "+".join(["-" * (width * box)] * box)
+    for row in range(size):
         print(
             "".join(
-                grid[row][col].center(width) + ("|" if str(col) in "25" else "") for col in range(9)
+                grid[row][col].center(width)
+                + ("|" if col % box == box - 1 and col != size - 1 else "")
+                for col in range(size)
             )
         )
-        if str(row) in "25":
+        if row % box == box - 1 and row != size - 1:
             print(line)
     print()
 
@@ -86,10 +125,11 @@ def get_block(grid: tp.List[tp.List[str]], pos: tp.Tuple[int, int]) -> tp.List[s
     ['2', '8', '.', '.', '.', '5', '.', '7', '9']
     """
     block: tp.List[str] = []
-    line = 3 * (pos[0] // 3)
-    column = 3 * (pos[1] // 3)
-    for i in range(3):
-        for j in range(3):
+    box = math.isqrt(len(grid))
+    line = box * (pos[0] // box)
+    column = box * (pos[1] // box)
+    for i in range(box):
+        for j in range(box):
             block += grid[line + i][column + j]
     return block
 
@@ -112,7 +152,9 @@ def find_empty_positions(
     return None
 
 
-def find_possible_values(grid: tp.List[tp.List[str]], pos: tp.Tuple[int, int]) -> tp.Set[str]:
+def find_possible_values(
+    grid: tp.List[tp.List[str]], pos: tp.Tuple[int, int], alphabet: tp.Optional[str] = None
+) -> tp.Set[str]:
     """Вернуть множество возможных значения для указанной позиции
 
     >>> grid = read_sudoku('puzzle1.txt')
@@ -123,7 +165,7 @@ def find_possible_values(grid: tp.List[tp.List[str]], pos: tp.Tuple[int, int]) -
     >>> values == {'2', '5', '9'}
     True
     """
-    all_values = set([str(i) for i in range(1, 10)])
+    all_values = set(alphabet or default_alphabet(len(grid)))
     row_values = set(get_row(grid, pos))
     col_values = set(get_col(grid, pos))
     block_values = set(get_block(grid, pos))
@@ -131,8 +173,537 @@ def find_possible_values(grid: tp.List[tp.List[str]], pos: tp.Tuple[int, int]) -
     return possible_values
 
 
-def solve(grid: tp.List[tp.List[str]]) -> tp.Optional[tp.List[tp.List[str]]]:
-    """ Решение пазла, заданного в grid """
+def to_flat(grid: tp.List[tp.List[str]], alphabet: tp.Optional[str] = None) -> bytearray:
+    """Переводит сетку в плоский массив: одна клетка - один байт с номером
+    символа в алфавите, начиная с 1, 0 - пустая клетка
+
+    >>> to_flat([['1', '.'], ['.', '2']])
+    bytearray(b'\\x01\\x00\\x00\\x02')
+    """
+    codes = {c: k for k, c in enumerate(alphabet or default_alphabet(len(grid)), start=1)}
+    codes["."] = 0
+    return bytearray(codes[e] for row in grid for e in row)
+
+
+def from_flat(
+    values: tp.Union[bytes, bytearray], size: int = 9, alphabet: tp.Optional[str] = None
+) -> tp.List[tp.List[str]]:
+    """Переводит плоский массив обратно в сетку
+
+    >>> from_flat(bytearray([1, 0, 0, 2]), 2)
+    [['1', '.'], ['.', '2']]
+    """
+    symbols = "." + (alphabet or default_alphabet(size))
+    return group([symbols[value] for value in values], size)
+
+
+class _Tables(tp.NamedTuple):
+    size: int
+    full: int
+    rows: tp.List[int]
+    cols: tp.List[int]
+    boxes: tp.List[int]
+    units: tp.List[tp.List[int]]
+    cell_units: tp.List[tp.Tuple[int, int, int]]
+    box: int
+    # segments[0][r][j] - клетки строки r в j-м по счету квадрате полосы,
+    # segments[1][c][j] - клетки столбца c в j-м по счету квадрате стопки
+    segments: tp.Tuple[tp.List[tp.List[tp.List[int]]], tp.List[tp.List[tp.List[int]]]]
+
+
+@functools.lru_cache(maxsize=None)
+def _tables(size: int) -> _Tables:
+    """Таблицы индексов строк, столбцов и квадратов для плоской сетки size x size"""
+    box = math.isqrt(size)
+    if box * box != size:
+        raise ValueError(f"Grid size {size} is not a square of a box size")
+    cells = range(size * size)
+    rows = [i // size for i in cells]
+    cols = [i % size for i in cells]
+    boxes = [(r // box) * box + c // box for r, c in zip(rows, cols)]
+    units = (
+        [[i for i in cells if rows[i] == k] for k in range(size)]
+        + [[i for i in cells if cols[i] == k] for k in range(size)]
+        + [[i for i in cells if boxes[i] == k] for k in range(size)]
+    )
+    cell_units = [(rows[i], size + cols[i], 2 * size + boxes[i]) for i in cells]
+    row_segments = [[units[r][j * box : (j + 1) * box] for j in range(box)] for r in range(size)]
+    col_segments = [
+        [units[size + c][j * box : (j + 1) * box] for j in range(box)] for c in range(size)
+    ]
+    return _Tables(
+        size,
+        (1 << size) - 1,
+        rows,
+        cols,
+        boxes,
+        units,
+        cell_units,
+        box,
+        (row_segments, col_segments),
+    )
+
+
+class _Restart(Exception):
+    """Перебор исчерпал отведенное число узлов"""
+
+
+class _BitmaskSolver:
+    """
+    Решатель на битовых масках: для каждой строки, столбца и квадрата
+    хранится маска уже поставленных цифр, а для каждой клетки - маска
+    исключенных кандидатов; маски обновляются при каждой постановке и
+    откате. На каждом шаге ставятся одиночки (naked и hidden singles) и
+    исключаются кандидаты по пересечениям линий и квадратов (pointing и
+    claiming), а перебор ведется по клетке с наименьшим числом кандидатов
+    или по цифре с наименьшим числом мест в строке, столбце или квадрате.
+
+    Клетка для перебора выбирается по числу кандидатов на единицу веса ее
+    строки, столбца и квадрата (dom/wdeg); вес растет на каждом
+    противоречии, найденном в этой строке, столбце или квадрате.
+    """
+
+    def __init__(self, values: bytearray, size: int, strict: bool = False) -> None:
+        self.t = _tables(size)
+        self.values = bytearray(values)
+        # Маски строк, затем столбцов, затем квадратов - в порядке t.units
+        self.masks = [0] * (3 * size)
+        self.excluded = [0] * (size * size)
+        self.cell_units = self.t.cell_units
+        self.trail: tp.List[int] = []
+        self.excluded_trail: tp.List[tp.Tuple[int, int]] = []
+        # Каждая цифра обязана встретиться только в тех строках, столбцах и
+        # квадратах, где подсказки не повторяются: иначе цифр больше, чем клеток
+        self.distinct = [True] * (3 * size)
+        for i, value in enumerate(values):
+            if value:
+                bit = 1 << (value - 1)
+                for k in self.cell_units[i]:
+                    if self.masks[k] & bit:
+                        self.distinct[k] = False
+                    self.masks[k] |= bit
+        # В строгом режиме пазл с повторяющейся подсказкой не решается
+        self.consistent = not strict or all(self.distinct)
+        self.empty = [i for i, value in enumerate(values) if not value]
+        # Сколько раз строка, столбец или квадрат приводили к противоречию
+        self.weights = [1] * (3 * size)
+        # На сетке 9x9 исключения по пересечениям дороже перебора, который они экономят
+        self.locked_candidates = size > 9
+        self.rng: tp.Optional[random.Random] = None
+        self.budget = 0
+        # Статистика перебора, см. SolveStats
+        self.nodes = self.backtracks = self.max_depth = self.propagations = self.restarts = 0
+
+    def candidates(self, i: int) -> int:
+        masks = self.masks
+        r, c, b = self.cell_units[i]
+        return self.t.full & ~(masks[r] | masks[c] | masks[b] | self.excluded[i])
+
+    def place(self, i: int, bit: int) -> None:
+        r, c, b = self.cell_units[i]
+        masks = self.masks
+        masks[r] |= bit
+        masks[c] |= bit
+        masks[b] |= bit
+        self.values[i] = bit.bit_length()
+        self.trail.append(i)
+
+    def exclude(self, i: int, bits: int) -> None:
+        self.excluded[i] |= bits
+        self.excluded_trail.append((i, bits))
+
+    def mark(self) -> tp.Tuple[int, int]:
+        return len(self.trail), len(self.excluded_trail)
+
+    def undo(self, mark: tp.Tuple[int, int]) -> None:
+        masks, trail = self.masks, self.trail
+        while len(trail) > mark[0]:
+            i = trail.pop()
+            bit = ~(1 << (self.values[i] - 1))
+            self.values[i] = 0
+            r, c, b = self.cell_units[i]
+            masks[r] &= bit
+            masks[c] &= bit
+            masks[b] &= bit
+        excluded, excluded_trail = self.excluded, self.excluded_trail
+        while len(excluded_trail) > mark[1]:
+            i, bits = excluded_trail.pop()
+            excluded[i] ^= bits
+
+    def propagate(self, hidden_singles: bool = True) -> bool:
+        if not self.consistent:
+            return False
+        values, masks, cell_units = self.values, self.masks, self.cell_units
+        excluded, distinct = self.excluded, self.distinct
+        full = self.t.full
+        candidates = [0] * len(values)
+        changed = True
+        while changed:
+            changed = False
+            for i in self.empty:
+                if values[i]:
+                    continue
+                r, c, b = cell_units[i]
+                cell = full & ~(masks[r] | masks[c] | masks[b] | excluded[i])
+                if not cell:
+                    self.weights[r] += 1
+                    self.weights[c] += 1
+                    self.weights[b] += 1
+                    return False
+                if not cell & (cell - 1):
+                    self.place(i, cell)
+                    self.propagations += 1
+                    changed = True
+                candidates[i] = cell
+            if changed or not hidden_singles:
+                continue
+            # Кандидаты посчитаны до постановок в этом цикле, поэтому могут
+            # быть шире настоящих: единственное место цифры по ним остается
+            # единственным возможным, но его надо перепроверить по маскам
+            for k, unit in enumerate(self.t.units):
+                if not distinct[k]:
+                    continue
+                once = twice = 0
+                for i in unit:
+                    if not values[i]:
+                        twice |= once & candidates[i]
+                        once |= candidates[i]
+                placed = masks[k]
+                if (once | placed) != full:
+                    self.weights[k] += 1
+                    return False
+                hidden = once & ~twice & ~placed
+                while hidden:
+                    bit = hidden & -hidden
+                    hidden ^= bit
+                    for i in unit:
+                        if candidates[i] & bit and not values[i]:
+                            break
+                    else:
+                        return False
+                    r, c, b = cell_units[i]
+                    if (masks[r] | masks[c] | masks[b]) & bit:
+                        return False
+                    self.place(i, bit)
+                    self.propagations += 1
+                    changed = True
+            if changed:
+                continue
+            # Если цифра квадрата может стоять только на одной его линии, то в
+            # остальной части линии ее быть не может, и наоборот
+            if self.locked_candidates and self.intersections(candidates):
+                changed = True
+        return True
+
+    def intersections(self, candidates: tp.List[int]) -> bool:
+        """Исключения pointing и claiming, возвращает True, если что-то исключено"""
+        values, masks, distinct = self.values, self.masks, self.distinct
+        size, box = self.t.size, self.t.box
+        changed = False
+        for orientation, segments in enumerate(self.t.segments):
+            seg = [
+                [
+                    functools.reduce(
+                        operator.or_, [candidates[i] for i in cells if not values[i]], 0
+                    )
+                    for cells in line_segments
+                ]
+                for line_segments in segments
+            ]
+            for line in range(size):
+                band = line // box
+                line_unit = orientation * size + line
+                for j in range(box):
+                    inside = seg[line][j]
+                    if not inside:
+                        continue
+                    line_only = box_only = 0
+                    for k in range(box):
+                        if k != j:
+                            line_only |= seg[line][k]
+                        other = band * box + k
+                        if other != line:
+                            box_only |= seg[other][j]
+                    if orientation == 0:
+                        box_unit = 2 * size + band * box + j
+                    else:
+                        box_unit = 2 * size + j * box + band
+                    pointing = inside & ~box_only & ~masks[box_unit] & line_only
+                    if pointing and distinct[box_unit]:
+                        for k in range(box):
+                            if k != j:
+                                for i in segments[line][k]:
+                                    if candidates[i] & pointing and not values[i]:
+                                        self.exclude(i, candidates[i] & pointing)
+                                        candidates[i] &= ~pointing
+                                        changed = True
+                    claiming = inside & ~line_only & ~masks[line_unit] & box_only
+                    if claiming and distinct[line_unit]:
+                        for k in range(box):
+                            other = band * box + k
+                            if other != line:
+                                for i in segments[other][j]:
+                                    if candidates[i] & claiming and not values[i]:
+                                        self.exclude(i, candidates[i] & claiming)
+                                        candidates[i] &= ~claiming
+                                        changed = True
+        return changed
+
+    def branches(self) -> tp.List[tp.Tuple[int, int]]:
+        """
+        Варианты (клетка, бит цифры) для перебора: все кандидаты самой
+        ограниченной клетки или все места самой ограниченной цифры.
+        """
+        values, weights, cell_units = self.values, self.weights, self.cell_units
+        candidates = [0] * len(values)
+        best, best_count, best_weight = -1, self.t.size + 1, 1
+        for i in self.empty:
+            if not values[i]:
+                candidates[i] = self.candidates(i)
+                count = bin(candidates[i]).count("1")
+                r, c, b = cell_units[i]
+                weight = weights[r] + weights[c] + weights[b]
+                # Меньше кандидатов на единицу веса: count / weight < best_count / best_weight
+                if count * best_weight < best_count * weight:
+                    best, best_count, best_weight = i, count, weight
+        if best < 0:
+            return []
+        branches = []
+        cell = candidates[best]
+        while cell:
+            bit = cell & -cell
+            cell ^= bit
+            branches.append((best, bit))
+
+        # Цифры, у которых в строке, столбце или квадрате ровно два или три места
+        if best_count > 2:
+            for k, unit in enumerate(self.t.units):
+                if not self.distinct[k]:
+                    continue
+                once = twice = thrice = four = 0
+                for i in unit:
+                    cell = candidates[i]
+                    four |= thrice & cell
+                    thrice |= twice & cell
+                    twice |= once & cell
+                    once |= cell
+                few = twice & ~four if best_count > 3 else twice & ~thrice
+                if few:
+                    bit = few & -few
+                    places = [(i, bit) for i in unit if candidates[i] & bit]
+                    if len(places) < len(branches):
+                        branches = places
+                        if len(places) == 2:
+                            break
+        if self.rng:
+            self.rng.shuffle(branches)
+        return branches
+
+    def solved(self) -> bool:
+        return all(self.values[i] for i in self.empty)
+
+    def search(self, depth: int = 0) -> bool:
+        self.nodes += 1
+        if self.nodes == self.budget:
+            raise _Restart()
+        if depth > self.max_depth:
+            self.max_depth = depth
+        start = self.mark()
+        if not self.propagate():
+            self.undo(start)
+            return False
+        mark = self.mark()
+        if self.solved():
+            return True
+        for i, bit in self.branches():
+            self.place(i, bit)
+            if self.search(depth + 1):
+                return True
+            self.undo(mark)
+            self.backtracks += 1
+        self.undo(start)
+        return False
+
+    def search_with_restarts(self, budget: int, seed: int = 0) -> bool:
+        """
+        Перебор с перезапусками: если решение не найдено за budget узлов,
+        поиск начинается заново со случайным порядком вариантов, а лимит
+        растет в 1.2 раза. Так решатель не застревает надолго в неудачной
+        ветке, что на больших сетках случается постоянно. Веса строк,
+        столбцов и квадратов при перезапуске сохраняются, поэтому новый
+        перебор сразу начинает с клеток, на которых спотыкался прежний.
+        """
+        rng = random.Random(seed)
+        start = self.mark()
+        while True:
+            self.budget = self.nodes + budget
+            try:
+                return self.search()
+            except _Restart:
+                self.undo(start)
+                self.restarts += 1
+            self.rng = rng
+            budget = budget * 6 // 5
+
+    def count(self, limit: int) -> int:
+        """Считает решения, но не больше limit; сетка остается нетронутой"""
+        start = self.mark()
+        if not self.propagate():
+            self.undo(start)
+            return 0
+        mark = self.mark()
+        if self.solved():
+            self.undo(start)
+            return 1
+        total = 0
+        for i, bit in self.branches():
+            self.place(i, bit)
+            total += self.count(limit - total)
+            self.undo(mark)
+            if total >= limit:
+                break
+        self.undo(start)
+        return total
+
+
+def _exact_cover(values: bytearray, size: int) -> tp.Optional[DancingLinks]:
+    """
+    Сводит Судоку к точному покрытию: строка (клетка, цифра) покрывает
+    столбцы "клетка заполнена", "цифра в строке", "цифра в столбце" и
+    "цифра в квадрате". Возвращает None, если подсказки противоречат друг другу.
+    """
+    t = _tables(size)
+    cells = size * size
+    rows = [
+        [
+            i,
+            cells + t.rows[i] * size + d,
+            2 * cells + t.cols[i] * size + d,
+            3 * cells + t.boxes[i] * size + d,
+        ]
+        for i in range(cells)
+        for d in range(size)
+    ]
+    dlx = DancingLinks(4 * cells, rows)
+    for i, value in enumerate(values):
+        if value and not dlx.select(i * size + value - 1):
+            return None
+    return dlx
+
+
+def _fill_rows(values: bytearray, size: int, rows: tp.List[int]) -> bytearray:
+    solution = bytearray(values)
+    for row in rows:
+        solution[row // size] = row % size + 1
+    return solution
+
+
+def _dlx_solutions(values: bytearray, size: int) -> tp.Iterator[bytearray]:
+    dlx = _exact_cover(values, size)
+    if dlx is None:
+        return
+    for rows in dlx.solutions():
+        yield _fill_rows(values, size, rows)
+
+
+_STAT_FIELDS = ("nodes", "backtracks", "max_depth", "propagations", "restarts")
+
+
+def _solve_bitmask(
+    values: bytearray,
+    size: int,
+    stats: tp.Optional[tp.Dict[str, int]] = None,
+    strict: bool = False,
+) -> tp.Optional[bytearray]:
+    solver = _BitmaskSolver(values, size, strict)
+    solved = solver.search_with_restarts(size * size)
+    if stats is not None:
+        stats.update((field, getattr(solver, field)) for field in _STAT_FIELDS)
+    return solver.values if solved else None
+
+
+def _solve_dlx(
+    values: bytearray,
+    size: int,
+    stats: tp.Optional[tp.Dict[str, int]] = None,
+    strict: bool = False,
+) -> tp.Optional[bytearray]:
+    # Точное покрытие всегда строгое: повторяющиеся подсказки не покрываются
+    dlx = _exact_cover(values, size)
+    if dlx is None:
+        return None
+    rows = next(dlx.solutions(), None)
+    if stats is not None:
+        # У DLX нет распространения ограничений и перезапусков
+        stats.update(nodes=dlx.nodes, backtracks=dlx.backtracks, max_depth=dlx.max_depth)
+    return None if rows is None else _fill_rows(values, size, rows)
+
+
+_BACKENDS = {"bitmask": _solve_bitmask, "dlx": _solve_dlx}
+
+
+class SolveStats(tp.NamedTuple):
+    """Статистика решения одного пазла"""
+
+    # Узлы перебора (для DLX - испробованные строки покрытия)
+    nodes: int = 0
+    # Варианты, от которых пришлось отказаться
+    backtracks: int = 0
+    # Наибольшая глубина перебора
+    max_depth: int = 0
+    # Клетки, заполненные naked и hidden singles
+    propagations: int = 0
+    # Перезапуски перебора со случайным порядком
+    restarts: int = 0
+    # Время решения в секундах
+    elapsed: float = 0.0
+
+
+@tp.overload
+def solve(
+    grid: tp.List[tp.List[str]],
+    backend: str = ...,
+    alphabet: tp.Optional[str] = ...,
+    stats: tp.Literal[False] = ...,
+    strict: bool = ...,
+) -> tp.Optional[tp.List[tp.List[str]]]: ...
+
+
+@tp.overload
+def solve(
+    grid: tp.List[tp.List[str]],
+    backend: str = ...,
+    alphabet: tp.Optional[str] = ...,
+    *,
+    stats: tp.Literal[True],
+    strict: bool = ...,
+) -> tp.Tuple[tp.Optional[tp.List[tp.List[str]]], SolveStats]: ...
+
+
+def solve(
+    grid: tp.List[tp.List[str]],
+    backend: str = "bitmask",
+    alphabet: tp.Optional[str] = None,
+    stats: bool = False,
+    strict: bool = False,
+) -> tp.Any:
+    """ Решение пазла, заданного в grid
+
+    Сетки 25x25 заполнены наполовину и больше решаются за доли секунды, а
+    при 40-48% подсказок (250-300 из 625) обычно за секунды, но отдельные
+    пазлы требуют десятков тысяч узлов перебора. DLX на них намного медленнее.
+
+    С stats=True возвращается пара (решение, SolveStats).
+
+    Если подсказки повторяются в строке, столбце или квадрате, решатель
+    bitmask по умолчанию просто не требует от этой строки, столбца или
+    квадрата всех цифр и заполняет остальные клетки. С strict=True такой
+    пазл не решается и возвращается None, как у DLX, который строг всегда.
+
+    >>> _, stats = solve(read_sudoku('puzzle1.txt'), stats=True)
+    >>> stats.nodes, stats.backtracks, stats.propagations
+    (1, 0, 51)
+    """
     """ Как решать Судоку?
         1. Найти свободную позицию
         2. Найти все возможные значения, которые могут находиться на этой позиции
@@ -144,41 +715,90 @@ def solve(grid: tp.List[tp.List[str]]) -> tp.Optional[tp.List[tp.List[str]]]:
     >>> solve(grid)
     [['5', '3', '4', '6', '7', '8', '9', '1', '2'], ['6', '7', '2', '1', '9', '5', '3', '4', '8'], ['1', '9', '8', '3', '4', '2', '5', '6', '7'], ['8', '5', '9', '7', '6', '1', '4', '2', '3'], ['4', '2', '6', '8', '5', '3', '7', '9', '1'], ['7', '1', '3', '9', '2', '4', '8', '5', '6'], ['9', '6', '1', '5', '3', '7', '2', '8', '4'], ['2', '8', '7', '4', '1', '9', '6', '3', '5'], ['3', '4', '5', '2', '8', '6', '1', '7', '9']]
     """
-    free_pos = find_empty_positions(grid)
-    if not free_pos:
-        return grid
-    possible_values = find_possible_values(grid, free_pos)
-    for values in possible_values:
-        grid[free_pos[0]][free_pos[1]] = values
-        decision = solve(grid)
-        if decision:
-            return decision
-    grid[free_pos[0]][free_pos[1]] = "."
-    return None
+    if backend not in _BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {sorted(_BACKENDS)}")
+    size = len(grid)
+    alphabet = alphabet or default_alphabet(size)
+    counters: tp.Dict[str, int] = {}
+    start = time.perf_counter()
+    solution = _BACKENDS[backend](to_flat(grid, alphabet), size, counters, strict)
+    elapsed = time.perf_counter() - start
+    if solution is not None:
+        for i, value in enumerate(solution):
+            grid[i // size][i % size] = alphabet[value - 1]
+    result = grid if solution is not None else None
+    if stats:
+        return result, SolveStats(elapsed=elapsed, **counters)
+    return result
 
 
-def check_solution(solution: tp.List[tp.List[str]]) -> bool:
-    """ Если решение solution верно, то вернуть True, в противном случае False """
-    # TODO: Add doctests with bad puzzles
-    all_values = set([str(i) for i in range(1, 10)])
-    for line in range(len(solution)):
-        check_line = get_row(solution, (line, 0))
-        if all_values != set(check_line):
-            return False
-    for column in range(len(solution)):
-        check_column = get_col(solution, (0, column))
-        if all_values != set(check_column):
-            return False
-    for line in range(1, len(solution), 3):
-        for column in range(1, len(solution), 3):
-            check_block = get_block(solution, (line, column))
-            if all_values != set(check_block):
+def solve_all(
+    grid: tp.List[tp.List[str]], alphabet: tp.Optional[str] = None
+) -> tp.Iterator[tp.List[tp.List[str]]]:
+    """Перечисляет все решения пазла, исходная сетка не изменяется
+
+    >>> grid = read_sudoku('puzzle1.txt')
+    >>> len(list(solve_all(grid)))
+    1
+    """
+    size = len(grid)
+    for solution in _dlx_solutions(to_flat(grid, alphabet), size):
+        yield from_flat(solution, size, alphabet)
+
+
+def count_solutions(
+    grid: tp.List[tp.List[str]], limit: tp.Optional[int] = None, alphabet: tp.Optional[str] = None
+) -> int:
+    """Считает решения пазла, но не больше limit (если он задан)
+
+    >>> grid = read_sudoku('puzzle1.txt')
+    >>> count_solutions(grid)
+    1
+    >>> count_solutions(create_grid('.' * 81), limit=1000)
+    1000
+    """
+    count = 0
+    for _ in _dlx_solutions(to_flat(grid, alphabet), len(grid)):
+        count += 1
+        if count == limit:
+            break
+    return count
+
+
+def check_solution(solution: tp.List[tp.List[str]], alphabet: tp.Optional[str] = None) -> bool:
+    """ Если решение solution верно, то вернуть True, в противном случае False
+
+    >>> check_solution(solve(read_sudoku('puzzle1.txt')))
+    True
+    >>> check_solution(read_sudoku('puzzle1.txt'))
+    False
+    >>> check_solution([['1'] * 9] * 9)
+    False
+    """
+    size = len(solution)
+    if any(len(row) != size for row in solution):
+        return False
+    alphabet = alphabet or default_alphabet(size)
+    if any(e not in alphabet for row in solution for e in row):
+        return False
+    return _check_flat(to_flat(solution, alphabet), size)
+
+
+def _check_flat(values: bytearray, size: int) -> bool:
+    t = _tables(size)
+    for unit in t.units:
+        mask = 0
+        for i in unit:
+            if not values[i]:
                 return False
+            mask |= 1 << (values[i] - 1)
+        if mask != t.full:
+            return False
     return True
 
 
-def generate_sudoku(N: int) -> tp.List[tp.List[str]]:
-    """Генерация судоку заполненного на N элементов
+def generate_sudoku(N: int, size: int = 9) -> tp.List[tp.List[str]]:
+    """Генерация судоку size x size заполненного на N элементов
 
     >>> grid = generate_sudoku(40)
     >>> sum(1 for row in grid for e in row if e == '.')
@@ -198,28 +818,267 @@ def generate_sudoku(N: int) -> tp.List[tp.List[str]]:
     >>> solution = solve(grid)
     >>> check_solution(solution)
     True
+    >>> grid = generate_sudoku(150, size=16)
+    >>> sum(1 for row in grid for e in row if e == '.')
+    106
+    >>> check_solution(solve(grid))
+    True
     """
-    clear_grid = [["."] * 9 for i in range(1, 10)]
-    grid = solve(clear_grid)
-    while grid is None:
-        grid = solve(clear_grid)
-    count_dots = 81 - min(N, 81)
-    while count_dots:
-        line = random.randint(0, 8)
-        column = random.randint(0, 8)
-        if grid:
-            if grid[line][column] != ".":
-                grid[line][column] = "."
-                count_dots -= 1
-    return grid
+    cells = size * size
+    values = _random_solution(size)
+    for i in random.sample(range(cells), cells - min(N, cells)):
+        values[i] = 0
+    return from_flat(values, size)
 
 
-if __name__ == "__main__":
+def _random_solution(size: int = 9) -> bytearray:
+    """Случайная заполненная сетка: квадраты на диагонали независимы,
+    поэтому они заполняются случайными перестановками, а остальное решается"""
+    t = _tables(size)
+    box = math.isqrt(size)
+    values = bytearray(size * size)
+    for k in range(0, size, box + 1):
+        unit = t.units[2 * size + k]
+        for i, value in zip(unit, random.sample(range(1, size + 1), size)):
+            values[i] = value
+    solution = _solve_bitmask(values, size)
+    assert solution is not None
+    return solution
+
+
+def generate_unique_sudoku(N: int = 17, size: int = 9) -> tp.List[tp.List[str]]:
+    """Генерация судоку size x size с единственным решением,
+    заполненного не меньше чем на N элементов
+
+    Клетки случайной заполненной сетки очищаются в случайном порядке, клетка
+    остается пустой только если решение по-прежнему единственно.
+
+    >>> grid = generate_unique_sudoku(30)
+    >>> sum(1 for row in grid for e in row if e != '.') >= 30
+    True
+    >>> count_solutions(grid, limit=2)
+    1
+    """
+    cells = size * size
+    values = _random_solution(size)
+    givens = cells
+    for i in random.sample(range(cells), cells):
+        if givens <= N:
+            break
+        value = values[i]
+        values[i] = 0
+        solver = _BitmaskSolver(values, size)
+        # Если значение клетки следует из остальных, решение заведомо единственно
+        if solver.candidates(i) == 1 << (value - 1) or solver.count(2) == 1:
+            givens -= 1
+        else:
+            values[i] = value
+    return from_flat(values, size)
+
+
+def rate_difficulty(grid: tp.List[tp.List[str]], alphabet: tp.Optional[str] = None) -> str:
+    """Оценка сложности по приемам, которых достаточно для решения:
+    "easy" - только naked singles, "medium" - еще и hidden singles
+    (а для сеток больше 9x9 и locked candidates), "hard" - без перебора не обойтись
+
+    >>> rate_difficulty(read_sudoku('puzzle1.txt'))
+    'easy'
+    >>> rate_difficulty(create_grid(
+    ...     "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4.."))
+    'hard'
+    """
+    values = to_flat(grid, alphabet)
+    solver = _BitmaskSolver(values, len(grid))
+    if solver.propagate(hidden_singles=False) and solver.solved():
+        return "easy"
+    solver = _BitmaskSolver(values, len(grid))
+    if solver.propagate() and solver.solved():
+        return "medium"
+    return "hard"
+
+
+def read_puzzles(path: tp.Union[str, pathlib.Path]) -> tp.Iterator[str]:
+    """Построчно читает файл с пазлами в формате size * size символов на строку
+
+    Пустые клетки могут быть заданы как ".", так и "0".
+    """
+    path = pathlib.Path(path)
+    with path.open() as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line.replace("0", ".")
+
+
+def _puzzle_alphabet(puzzle: str) -> tp.Optional[str]:
+    """Алфавит пазла, записанного одной строкой, или None, если строка испорчена:
+    не того размера или с чужими символами"""
+    size = math.isqrt(len(puzzle))
+    box = math.isqrt(size)
+    alphabet = SYMBOLS[:size]
+    if (
+        not size
+        or size * size != len(puzzle)
+        or box * box != size
+        or size > len(SYMBOLS)
+        or not set(puzzle) <= set(alphabet + ".")
+    ):
+        return None
+    return alphabet
+
+
+def _solve_chunk(puzzles: tp.List[str], backend: str) -> tp.List[tp.Optional[str]]:
+    solutions: tp.List[tp.Optional[str]] = []
+    for puzzle in puzzles:
+        alphabet = _puzzle_alphabet(puzzle)
+        # Испорченная строка получает None, а не обрывает весь пакет ошибкой
+        if alphabet is None:
+            solutions.append(None)
+            continue
+        size = len(alphabet)
+        values = to_flat(create_grid(puzzle, alphabet), alphabet)
+        solution = _BACKENDS[backend](values, size, strict=True)
+        solutions.append("".join(alphabet[v - 1] for v in solution) if solution else None)
+    return solutions
+
+
+def solve_many(
+    puzzles: tp.Iterable[str],
+    workers: tp.Optional[int] = None,
+    chunksize: int = 256,
+    backend: str = "bitmask",
+) -> tp.Iterator[tp.Optional[str]]:
+    """Решает поток пазлов в пуле процессов, сохраняя порядок
+
+    Пазлы отправляются пачками по chunksize, одновременно в работе
+    не больше двух пачек на процесс, поэтому поток не читается целиком.
+    Пазлы решаются строго (см. solve), поэтому в ответах только верные
+    решения; для нерешаемых пазлов возвращается None.
+    """
+    puzzles = iter(puzzles)
+    chunks = iter(lambda: list(itertools.islice(puzzles, chunksize)), [])
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in chunks:
+            yield from _solve_chunk(chunk, backend)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: tp.Deque[Future[tp.List[tp.Optional[str]]]] = collections.deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_solve_chunk, chunk, backend))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def solve_file(
+    input_path: tp.Union[str, pathlib.Path],
+    output_path: tp.Union[str, pathlib.Path],
+    workers: tp.Optional[int] = None,
+    chunksize: int = 256,
+    backend: str = "bitmask",
+) -> tp.Tuple[int, float]:
+    """Решает все пазлы из файла и пишет решения в том же порядке
+
+    Для нерешаемых пазлов пишется пустая строка. Возвращает число
+    пазлов и затраченное время в секундах.
+    """
+    start = time.perf_counter()
+    count = 0
+    with pathlib.Path(output_path).open("w") as f:
+        for solution in solve_many(read_puzzles(input_path), workers, chunksize, backend):
+            f.write((solution or "") + "\n")
+            count += 1
+    return count, time.perf_counter() - start
+
+
+def profile_puzzles(
+    puzzles: tp.Iterable[str], backend: str = "bitmask"
+) -> tp.Iterator[tp.Tuple[str, SolveStats]]:
+    """Решает пазлы по одному в текущем процессе и возвращает статистику каждого.
+    Испорченные строки, как в solve_many, пропускаются"""
+    for puzzle in puzzles:
+        alphabet = _puzzle_alphabet(puzzle)
+        if alphabet is None:
+            continue
+        _, stats = solve(
+            create_grid(puzzle, alphabet), backend, alphabet, stats=True, strict=True
+        )
+        yield puzzle, stats
+
+
+def percentile(values: tp.Sequence[float], q: float) -> float:
+    """Перцентиль q (от 0 до 100) по методу ближайшего ранга
+
+    >>> percentile([5, 1, 4, 2, 3], 50)
+    3
+    >>> percentile(range(1, 101), 99)
+    99
+    >>> percentile([1, 2, 3], 100)
+    3
+    """
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def format_report(results: tp.Sequence[tp.Tuple[str, SolveStats]], top: int = 3) -> str:
+    """Отчет по перцентилям времени и числа узлов и список самых медленных пазлов"""
+    if not results:
+        return "No puzzles"
+    times = [stats.elapsed * 1000 for _, stats in results]
+    nodes = [stats.nodes for _, stats in results]
+    quantiles = (50, 90, 99, 100)
+    lines = [
+        f"Puzzles: {len(results)}, total {sum(times) / 1000:.2f}s",
+        "Latency, ms: "
+        + "  ".join(f"p{q} {percentile(times, q):.2f}" for q in quantiles).replace("p100", "max"),
+        "Nodes:       "
+        + "  ".join(f"p{q} {percentile(nodes, q)}" for q in quantiles).replace("p100", "max"),
+        "Slowest:",
+    ]
+    slowest = sorted(results, key=lambda result: result[1].elapsed, reverse=True)[:top]
+    for puzzle, stats in slowest:
+        lines.append(
+            f"  {stats.elapsed * 1000:.2f}ms nodes={stats.nodes} backtracks={stats.backtracks}"
+            f" max_depth={stats.max_depth} propagations={stats.propagations}"
+            f" restarts={stats.restarts} {puzzle}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: tp.Optional[tp.Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Sudoku solver")
+    parser.add_argument("puzzles", nargs="?", help="File with one puzzle per line")
+    parser.add_argument("-o", "--output", default="solutions.txt", help="File for solutions")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes")
+    parser.add_argument("--chunksize", type=int, default=256, help="Puzzles per task")
+    parser.add_argument("--backend", choices=sorted(_BACKENDS), default="bitmask")
+    parser.add_argument(
+        "--report", action="store_true", help="Print latency percentiles instead of solving"
+    )
+    args = parser.parse_args(argv)
+
+    if args.puzzles and args.report:
+        print(format_report(list(profile_puzzles(read_puzzles(args.puzzles), args.backend))))
+        return
+    if args.puzzles:
+        count, elapsed = solve_file(
+            args.puzzles, args.output, args.workers, args.chunksize, args.backend
+        )
+        print(f"Solved {count} puzzles in {elapsed:.2f}s ({count / elapsed:.1f} puzzles/sec)")
+        return
+
     for fname in ["puzzle1.txt", "puzzle2.txt", "puzzle3.txt"]:
         grid = read_sudoku(fname)
         display(grid)
-        solution = solve(grid)
+        solution = solve(grid, backend=args.backend)
         if not solution:
             print(f"Puzzle {fname} can't be solved")
         else:
             display(solution)
+
+
+if __name__ == "__main__":
+    main()
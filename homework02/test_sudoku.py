@@ -1,3 +1,7 @@
+import pathlib
+import random
+import tempfile
+import time
 import unittest
 
 import sudoku
@@ -240,3 +244,179 @@ class SudokuTestCase(unittest.TestCase):
         solution = sudoku.solve(grid)
         solved = sudoku.check_solution(solution)
         self.assertTrue(solved)
+
+    def test_flat(self):
+        grid = sudoku.read_sudoku("puzzle1.txt")
+        values = sudoku.to_flat(grid)
+        self.assertEqual(81, len(values))
+        self.assertEqual([5, 3, 0, 0, 7], list(values[:5]))
+        self.assertEqual(grid, sudoku.from_flat(values))
+
+    def test_solve_hard(self):
+        puzzle = (
+            "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4.."
+        )
+        grid = sudoku.create_grid(puzzle)
+        solution = sudoku.solve(grid)
+        self.assertTrue(sudoku.check_solution(solution))
+        for given, value in zip(puzzle, (e for row in solution for e in row)):
+            if given != ".":
+                self.assertEqual(given, value)
+
+    def test_solve_unsolvable(self):
+        puzzle = "12345678." + "........9" + "." * 63
+        grid = sudoku.create_grid(puzzle)
+        self.assertIsNone(sudoku.solve(grid))
+        self.assertEqual(sudoku.create_grid(puzzle), grid)
+
+    def test_solve_backends(self):
+        puzzle = (
+            "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4.."
+        )
+        expected_solution = sudoku.solve(sudoku.create_grid(puzzle))
+        for backend in ("bitmask", "dlx"):
+            with self.subTest(backend=backend):
+                self.assertEqual(
+                    expected_solution, sudoku.solve(sudoku.create_grid(puzzle), backend=backend)
+                )
+        with self.assertRaises(ValueError):
+            sudoku.solve(sudoku.create_grid(puzzle), backend="magic")
+
+        # Повторяющиеся подсказки: в строгом режиме решений нет ни у одного решателя
+        repeated = "123456789" * 2 + "." * 63
+        for backend in ("bitmask", "dlx"):
+            with self.subTest(backend=backend):
+                grid = sudoku.create_grid(repeated)
+                self.assertIsNone(sudoku.solve(grid, backend=backend, strict=True))
+        self.assertEqual(0, sudoku.count_solutions(sudoku.create_grid(repeated)))
+        self.assertEqual([None], list(sudoku.solve_many([repeated], workers=1)))
+
+    def test_count_solutions(self):
+        grid = sudoku.read_sudoku("puzzle1.txt")
+        self.assertEqual(1, sudoku.count_solutions(grid))
+        self.assertEqual(sudoku.solve(grid), next(sudoku.solve_all(grid)))
+
+        # Without any 1 and 2 these digits can be swapped, so there are at least two solutions
+        solution = sudoku.solve(sudoku.read_sudoku("puzzle1.txt"))
+        puzzle = [["." if e in "12" else e for e in row] for row in solution]
+        solutions = list(sudoku.solve_all(puzzle))
+        self.assertGreaterEqual(len(solutions), 2)
+        self.assertEqual(len(solutions), sudoku.count_solutions(puzzle))
+        self.assertIn(solution, solutions)
+        for found in solutions:
+            self.assertTrue(sudoku.check_solution(found))
+
+        self.assertEqual(0, sudoku.count_solutions(sudoku.create_grid("11" + "." * 79)))
+        self.assertEqual(50, sudoku.count_solutions(sudoku.create_grid("." * 81), limit=50))
+
+    def test_solve_many(self):
+        grid = sudoku.read_sudoku("puzzle1.txt")
+        puzzle = "".join(e for row in grid for e in row)
+        solution = "".join(e for row in sudoku.solve(grid) for e in row)
+        puzzles = [puzzle, "11" + "." * 79] * 5
+
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                solutions = list(sudoku.solve_many(puzzles, workers=workers, chunksize=3))
+                self.assertEqual([solution, None] * 5, solutions)
+
+        # Строки не того размера или с чужими символами не обрывают пакет
+        malformed = [puzzle[:-1], "x" * 81, "." * 10 * 10, puzzle]
+        self.assertEqual(
+            [None, None, None, solution], list(sudoku.solve_many(malformed, workers=1))
+        )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            input_path = pathlib.Path(tmpdir) / "puzzles.txt"
+            output_path = pathlib.Path(tmpdir) / "solutions.txt"
+            input_path.write_text(puzzle.replace(".", "0") + "\n\n" + "11" + "." * 79 + "\n")
+            self.assertEqual([puzzle, "11" + "." * 79], list(sudoku.read_puzzles(input_path)))
+            count, _ = sudoku.solve_file(input_path, output_path, workers=1)
+            self.assertEqual(2, count)
+            self.assertEqual(solution + "\n\n", output_path.read_text())
+
+    def test_generate_unique_sudoku(self):
+        for _ in range(5):
+            grid = sudoku.generate_unique_sudoku()
+            self.assertEqual(1, sudoku.count_solutions(grid, limit=2))
+            self.assertIn(sudoku.rate_difficulty(grid), {"easy", "medium", "hard"})
+
+        grid = sudoku.generate_unique_sudoku(50)
+        self.assertEqual(50, sum(1 for row in grid for e in row if e != "."))
+        self.assertEqual(1, sudoku.count_solutions(grid, limit=2))
+
+        self.assertNotEqual(sudoku.generate_sudoku(81), sudoku.generate_sudoku(81))
+
+    def test_rate_difficulty(self):
+        self.assertEqual("easy", sudoku.rate_difficulty(sudoku.read_sudoku("puzzle1.txt")))
+        medium = "4.8..5.295.1...74.7....8.1..19.4...7...6.9...8.67........8.1..6.7.9..1..1.3.....4"
+        self.assertEqual("medium", sudoku.rate_difficulty(sudoku.create_grid(medium)))
+        hard = "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4.."
+        self.assertEqual("hard", sudoku.rate_difficulty(sudoku.create_grid(hard)))
+
+    def test_large_grids(self):
+        alphabet = sudoku.default_alphabet(16)
+        grid = sudoku.create_grid("G" + "." * 254 + "1", alphabet)
+        self.assertEqual(grid, sudoku.create_grid("G" + "." * 254 + "1"))
+        self.assertEqual(16, len(grid))
+        self.assertTrue(all(len(row) == 16 for row in grid))
+        self.assertEqual(["G", ".", ".", "."], sudoku.get_block(grid, (1, 1))[:4])
+        self.assertEqual(set(alphabet) - {"G"}, sudoku.find_possible_values(grid, (0, 1)))
+
+        for size, givens in ((16, 100), (25, 400)):
+            grid = sudoku.generate_sudoku(givens, size=size)
+            self.assertEqual(size * size - givens, sum(row.count(".") for row in grid))
+            solution = sudoku.solve(grid)
+            self.assertTrue(sudoku.check_solution(solution))
+
+        # Наполовину заполненные 25x25 решаются почти без перебора
+        for seed in range(5):
+            random.seed(seed)
+            grid = sudoku.generate_sudoku(313, size=25)
+            solution, stats = sudoku.solve(grid, stats=True)
+            self.assertTrue(sudoku.check_solution(solution))
+            self.assertLess(stats.nodes, 1000)
+
+        # При 40-48% подсказок перебор долгий, но перезапуски не теряют веса
+        start = time.monotonic()
+        for seed, givens in enumerate(range(250, 301, 10)):
+            random.seed(seed)
+            grid = sudoku.generate_sudoku(givens, size=25)
+            self.assertTrue(sudoku.check_solution(sudoku.solve(grid)))
+        self.assertLess(time.monotonic() - start, 60)
+
+        grid = sudoku.generate_unique_sudoku(160, size=16)
+        self.assertEqual(1, sudoku.count_solutions(grid, limit=2))
+        puzzle = "".join(e for row in grid for e in row)
+        (solution,) = sudoku.solve_many([puzzle], workers=1)
+        self.assertTrue(sudoku.check_solution(sudoku.create_grid(solution, alphabet)))
+
+        with self.assertRaises(ValueError):
+            sudoku.solve([["."] * 10] * 10)
+        self.assertEqual([], sudoku.create_grid(""))
+
+    def test_solve_stats(self):
+        hard = "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4.."
+        for backend in ("bitmask", "dlx"):
+            with self.subTest(backend=backend):
+                solution, stats = sudoku.solve(sudoku.create_grid(hard), backend, stats=True)
+                self.assertTrue(sudoku.check_solution(solution))
+                self.assertGreater(stats.nodes, 1)
+                self.assertGreater(stats.backtracks, 0)
+                self.assertLess(stats.backtracks, stats.nodes)
+                self.assertGreater(stats.max_depth, 0)
+                self.assertGreater(stats.elapsed, 0)
+
+        solution, stats = sudoku.solve(sudoku.create_grid("11" + "." * 79), stats=True)
+        self.assertIsNone(solution)
+        self.assertEqual(stats.nodes, stats.backtracks + 1)
+
+        easy = "".join(e for row in sudoku.read_sudoku("puzzle1.txt") for e in row)
+        # Испорченные строки не обрывают отчет
+        results = list(sudoku.profile_puzzles([easy, easy[:-1], "x" * 81, hard]))
+        self.assertEqual([easy, hard], [puzzle for puzzle, _ in results])
+        report = sudoku.format_report(results, top=1)
+        self.assertIn("Puzzles: 2", report)
+        self.assertIn("p50", report)
+        self.assertIn(hard, report)
+        self.assertNotIn(easy, report)
@@ -0,0 +1,344 @@
+import typing as tp
+
+Cell = tp.Tuple[int, int]
+# Серия живых клеток подряд в одной строке: строка, первый столбец, длина
+Run = tp.Tuple[int, int, int]
+
+
+class Node:
+    """
+    Узел квадродерева: квадрат 2**level x 2**level из четырех четвертей.
+    Узлы канонические - одинаковые квадраты представлены одним объектом,
+    поэтому их можно сравнивать и хешировать по идентичности.
+    """
+
+    __slots__ = ("nw", "ne", "sw", "se", "level", "population")
+
+    def __init__(
+        self, nw: "Node", ne: "Node", sw: "Node", se: "Node", level: int, population: int
+    ) -> None:
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.level = level
+        self.population = population
+
+
+class QuadTree:
+    """
+    Алгоритм HashLife Госпера на бесконечной плоскости.
+
+    Таблица узлов делает каждый квадрат каноническим, а для каждого узла
+    запоминается результат: его центральная половина через 2**j поколений.
+    Повторяющиеся в пространстве и во времени участки поэтому считаются один
+    раз, и прыжок на 2**j поколений стоит O(j) для периодичных узоров.
+
+    Таблица и результаты растут с каждым прыжком. Размер таблицы
+    проверяется между шагами 2**j внутри advance и после него: когда узлов
+    больше порога, collect оставляет только узлы, достижимые из текущего
+    узора и переданных в advance узлов keep, а из результатов - те, у
+    которых и узел, и ответ остались в таблице. Внутри одного прыжка порог
+    удваивается после каждой сборки, чтобы не пересчитывать сброшенные
+    результаты снова и снова.
+
+    >>> tree = QuadTree()
+    >>> glider = [(0, 1), (1, 2), (2, 0), (2, 1), (2, 2)]
+    >>> root = tree.advance(tree.from_cells(glider), 1 << 20)
+    >>> sorted(tree.cells(root)) == [(r + (1 << 18), c + (1 << 18)) for r, c in glider]
+    True
+    """
+
+    def __init__(self, max_nodes: int = 1 << 20) -> None:
+        self.max_nodes = max_nodes
+        self.off = Node(None, None, None, None, 0, 0)  # type: ignore
+        self.on = Node(None, None, None, None, 0, 1)  # type: ignore
+        self.table: tp.Dict[tp.Tuple[Node, Node, Node, Node], Node] = {}
+        self.results: tp.Dict[tp.Tuple[Node, int], Node] = {}
+        self.empties = [self.off]
+
+    def join(self, nw: Node, ne: Node, sw: Node, se: Node) -> Node:
+        key = (nw, ne, sw, se)
+        node = self.table.get(key)
+        if node is None:
+            population = nw.population + ne.population + sw.population + se.population
+            node = self.table[key] = Node(nw, ne, sw, se, nw.level + 1, population)
+        return node
+
+    def empty(self, level: int) -> Node:
+        while len(self.empties) <= level:
+            e = self.empties[-1]
+            self.empties.append(self.join(e, e, e, e))
+        return self.empties[level]
+
+    def pad(self, node: Node) -> Node:
+        """Тот же квадрат в центре вдвое большего пустого"""
+        e = self.empty(node.level - 1)
+        return self.join(
+            self.join(e, e, e, node.nw),
+            self.join(e, e, node.ne, e),
+            self.join(e, node.sw, e, e),
+            self.join(node.se, e, e, e),
+        )
+
+    def centre(self, node: Node) -> Node:
+        return self.join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    def is_padded(self, node: Node) -> bool:
+        """Лежат ли все живые клетки в центральной четверти квадрата"""
+        return (
+            node.level >= 3
+            and node.nw.population == node.nw.se.se.population
+            and node.ne.population == node.ne.sw.sw.population
+            and node.sw.population == node.sw.ne.ne.population
+            and node.se.population == node.se.nw.nw.population
+        )
+
+    def crop(self, node: Node) -> Node:
+        """Наименьший квадрат с тем же центром, в котором помещается узор:
+        одинаковые узоры с одинаковым центром дают один и тот же узел"""
+        while (
+            node.level > 3
+            and node.nw.population == node.nw.se.population
+            and node.ne.population == node.ne.sw.population
+            and node.sw.population == node.sw.ne.population
+            and node.se.population == node.se.nw.population
+        ):
+            node = self.centre(node)
+        return node
+
+    def successor(self, node: Node, j: int) -> Node:
+        """Центральная половина узла через 2**j поколений, j <= level - 2"""
+        if node.population == 0:
+            return node.nw
+        key = (node, j)
+        result = self.results.get(key)
+        if result is not None:
+            return result
+        if node.level == 2:
+            result = self.life_4x4(node)
+        else:
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+            # Девять перекрывающихся квадратов на уровень ниже; при полном
+            # прыжке каждый продвигается на половину, 2**(level - 3) поколений
+            i = j if j < node.level - 2 else j - 1
+            c1 = self.successor(nw, i)
+            c2 = self.successor(self.join(nw.ne, ne.nw, nw.se, ne.sw), i)
+            c3 = self.successor(ne, i)
+            c4 = self.successor(self.join(nw.sw, nw.se, sw.nw, sw.ne), i)
+            c5 = self.successor(self.centre(node), i)
+            c6 = self.successor(self.join(ne.sw, ne.se, se.nw, se.ne), i)
+            c7 = self.successor(sw, i)
+            c8 = self.successor(self.join(sw.ne, se.nw, sw.se, se.sw), i)
+            c9 = self.successor(se, i)
+            if j < node.level - 2:
+                # Девять квадратов уже продвинуты на 2**j, осталось собрать центр
+                result = self.join(
+                    self.join(c1.se, c2.sw, c4.ne, c5.nw),
+                    self.join(c2.se, c3.sw, c5.ne, c6.nw),
+                    self.join(c4.se, c5.sw, c7.ne, c8.nw),
+                    self.join(c5.se, c6.sw, c8.ne, c9.nw),
+                )
+            else:
+                # Вторая половина прыжка для четырех четвертей
+                result = self.join(
+                    self.successor(self.join(c1, c2, c4, c5), j - 1),
+                    self.successor(self.join(c2, c3, c5, c6), j - 1),
+                    self.successor(self.join(c4, c5, c7, c8), j - 1),
+                    self.successor(self.join(c5, c6, c8, c9), j - 1),
+                )
+        self.results[key] = result
+        return result
+
+    def life_4x4(self, node: Node) -> Node:
+        """Центр 2x2 квадрата 4x4 через одно поколение"""
+        grid = [
+            [node.nw.nw, node.nw.ne, node.ne.nw, node.ne.ne],
+            [node.nw.sw, node.nw.se, node.ne.sw, node.ne.se],
+            [node.sw.nw, node.sw.ne, node.se.nw, node.se.ne],
+            [node.sw.sw, node.sw.se, node.se.sw, node.se.se],
+        ]
+        cells = []
+        for x in (1, 2):
+            for y in (1, 2):
+                count = sum(
+                    grid[i][j].population
+                    for i in range(x - 1, x + 2)
+                    for j in range(y - 1, y + 2)
+                    if (i, j) != (x, y)
+                )
+                alive = count == 3 or (count == 2 and grid[x][y].population)
+                cells.append(self.on if alive else self.off)
+        return self.join(*cells)
+
+    def advance(self, node: Node, generations: int, keep: tp.Iterable[Node] = ()) -> Node:
+        """
+        Узор через generations поколений, с тем же центром. Число поколений
+        раскладывается на степени двойки, на каждую - один вызов successor.
+        Узлы из keep переживают сборку таблицы во время прыжка.
+        """
+        keep = list(keep)
+        threshold = self.max_nodes
+        for j in range(generations.bit_length()):
+            if generations >> j & 1:
+                if len(self.table) > threshold:
+                    self.collect([node, *keep])
+                    threshold = max(2 * threshold, 2 * len(self.table))
+                # Узор должен занимать центральную четверть, чтобы за 2**j
+                # поколений не выйти за центральную половину, которую вернет successor
+                while node.level < j + 2 or not self.is_padded(node):
+                    node = self.pad(node)
+                node = self.successor(self.pad(node), j)
+        node = self.crop(node)
+        if len(self.table) > self.max_nodes:
+            self.collect([node, *keep])
+        return node
+
+    def from_cells(self, cells: tp.Iterable[Cell], level: int = 3) -> Node:
+        """
+        Узел с живыми клетками cells и центром в точке (0, 0): квадрат уровня
+        level покрывает строки и столбцы от -2**(level - 1) до 2**(level - 1).
+        """
+        cells = list(cells)
+        half = 1 << (level - 1)
+        while any(not (-half <= r < half and -half <= c < half) for r, c in cells):
+            level += 1
+            half <<= 1
+        return self.crop(self.build(cells, level, -half, -half))
+
+    def build(self, cells: tp.List[Cell], level: int, top: int, left: int) -> Node:
+        if not cells:
+            return self.empty(level)
+        if level == 0:
+            return self.on
+        half = 1 << (level - 1)
+        quarters: tp.List[tp.List[Cell]] = [[], [], [], []]
+        for r, c in cells:
+            quarters[2 * (r >= top + half) + (c >= left + half)].append((r, c))
+        return self.join(
+            self.build(quarters[0], level - 1, top, left),
+            self.build(quarters[1], level - 1, top, left + half),
+            self.build(quarters[2], level - 1, top + half, left),
+            self.build(quarters[3], level - 1, top + half, left + half),
+        )
+
+    def from_runs(self, runs: tp.Iterable[Run]) -> Node:
+        """
+        То же, что from_cells, но из серий клеток (строка, столбец, длина).
+        Серии сразу раскладываются по маскам листьев 8x8, и дерево строится
+        снизу вверх только из непустых квадратов, без перебора клеток.
+        """
+        blocks: tp.Dict[tp.Tuple[int, int], int] = {}
+        for r, c, n in runs:
+            while n > 0:
+                # Часть серии до правого края листа
+                k = min(n, 8 - (c & 7))
+                key = (r >> 3, c >> 3)
+                blocks[key] = blocks.get(key, 0) | ((1 << k) - 1) << (8 * (r & 7) + (c & 7))
+                c += k
+                n -= k
+        if not blocks:
+            return self.empty(3)
+        # Квадрат с центром в (0, 0), выровненный по листьям
+        low = min(min(key) for key in blocks)
+        high = max(max(key) for key in blocks)
+        level, half = 4, 1
+        while -half > low or high >= half:
+            level += 1
+            half <<= 1
+        leaves: tp.Dict[tp.Tuple[int, int], Node] = {}
+        nodes = {
+            (i + half, j + half): self.leaf(mask, 3, leaves) for (i, j), mask in blocks.items()
+        }
+        for lower in range(3, level):
+            e = self.empty(lower)
+            parents = {(i >> 1, j >> 1) for i, j in nodes}
+            nodes = {
+                (i, j): self.join(
+                    nodes.get((2 * i, 2 * j), e),
+                    nodes.get((2 * i, 2 * j + 1), e),
+                    nodes.get((2 * i + 1, 2 * j), e),
+                    nodes.get((2 * i + 1, 2 * j + 1), e),
+                )
+                for i, j in parents
+            }
+        return self.crop(nodes[0, 0])
+
+    def leaf(self, mask: int, level: int, leaves: tp.Dict[tp.Tuple[int, int], Node]) -> Node:
+        """
+        Квадрат 2**level x 2**level по маске: строка i - биты с i * 2**level.
+        Одинаковые квадраты строятся один раз, через словарь leaves.
+        """
+        if not mask:
+            return self.empty(level)
+        if level == 0:
+            return self.on
+        node = leaves.get((level, mask))
+        if node is None:
+            size = 1 << level
+            half = size >> 1
+            row = (1 << half) - 1
+            quarters = [0, 0, 0, 0]
+            for i in range(size):
+                bits = mask >> (i * size)
+                q, shift = 2 * (i >= half), (i % half) * half
+                quarters[q] |= (bits & row) << shift
+                quarters[q + 1] |= (bits >> half & row) << shift
+            node = leaves[level, mask] = self.join(
+                *(self.leaf(quarter, level - 1, leaves) for quarter in quarters)
+            )
+        return node
+
+    def cells(
+        self,
+        node: Node,
+        top: tp.Optional[int] = None,
+        left: tp.Optional[int] = None,
+        window: tp.Optional[tp.Tuple[int, int, int, int]] = None,
+    ) -> tp.Iterator[Cell]:
+        """
+        Живые клетки узла с центром в (0, 0), или с левым верхним углом в
+        (top, left). Если задано окно (top, left, bottom, right), перечисляются
+        только клетки в нем, а поддеревья вне окна пропускаются.
+        """
+        if top is None or left is None:
+            top = left = -(1 << (node.level - 1))
+        if node.population == 0:
+            return
+        size = 1 << node.level
+        if window is not None:
+            w_top, w_left, w_bottom, w_right = window
+            if top >= w_bottom or left >= w_right or top + size <= w_top or left + size <= w_left:
+                return
+        if node.level == 0:
+            yield top, left
+            return
+        half = size >> 1
+        yield from self.cells(node.nw, top, left, window)
+        yield from self.cells(node.ne, top, left + half, window)
+        yield from self.cells(node.sw, top + half, left, window)
+        yield from self.cells(node.se, top + half, left + half, window)
+
+    def collect(self, roots: tp.Iterable[Node]) -> None:
+        """
+        Оставляет в таблице только узлы, достижимые из roots, а из
+        результатов - те, у которых узел и ответ остались в таблице.
+        """
+        table: tp.Dict[tp.Tuple[Node, Node, Node, Node], Node] = {}
+        stack = list(roots) + self.empties
+        while stack:
+            node = stack.pop()
+            if node.level == 0:
+                continue
+            key = (node.nw, node.ne, node.sw, node.se)
+            if key not in table:
+                table[key] = node
+                stack.extend(key)
+        self.table = table
+        # Ответ вне таблицы перестал бы быть каноническим
+        alive = {self.off, self.on, *table.values()}
+        self.results = {
+            key: result
+            for key, result in self.results.items()
+            if key[0] in alive and result in alive
+        }
@@ -1,16 +1,60 @@
+import functools
+import hashlib
+import itertools
+import multiprocessing
+import operator
+import os
 import pathlib
 import random
 import typing as tp
+import weakref
+from multiprocessing.shared_memory import SharedMemory
 
 import pygame
 from pygame.locals import *
 
+import hashlife
+import patterns
+
+try:
+    import numpy as np
+    import numpy.typing as npt
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
 Cell = tp.Tuple[int, int]
 Cells = tp.List[int]
 Grid = tp.List[Cells]
 
 
+class Board(tp.Protocol):
+    """
+    Поколение клеток, как его отдают движки: список строк (Grid) или
+    двумерный массив NumPy. Клетка читается как board[i][j].
+    """
+
+    def __getitem__(self, index: tp.Any) -> tp.Any:
+        ...
+
+    def __iter__(self) -> tp.Iterator[tp.Any]:
+        ...
+
+    def __len__(self) -> int:
+        ...
+
+
+G = tp.TypeVar("G", bound="GameOfLife")
+
+
+def _digest(data: bytes) -> bytes:
+    # Встроенный hash для bytes зависит от процесса, а хеши полос считаются в разных
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
 class GameOfLife:
+    # Сколько последних поколений помнить для поиска циклов
+    history_size = 1000
+
     def __init__(
         self,
         size: tp.Tuple[int, int],
@@ -20,21 +64,49 @@ class GameOfLife:
         # Размер клеточного поля
         self.rows, self.cols = size
         # Предыдущее поколение клеток
-        self.prev_generation = self.create_grid()
+        self._prev_generation = self.create_grid()
         # Текущее поколение клеток
         self.curr_generation = self.create_grid(randomize=randomize)
         # Максимальное число поколений
         self.max_generations = max_generations
         # Текущее число поколений
         self.generations = 1
+        self.reset_history()
 
-    def create_grid(self, randomize: bool = False) -> Grid:
+    def create_grid(self, randomize: bool = False) -> Board:
         # Copy from previous assignment
         grid = [[0 for i in range(self.cols)] for j in range(self.rows)]
         if randomize:
             return [[random.randint(0, 1) for i in range(self.cols)] for j in range(self.rows)]
         return grid
 
+    @property
+    def curr_generation(self) -> Board:
+        """
+        Текущее поколение клеток. Присваивание заменяет поле целиком и
+        сбрасывает историю поколений, если поле стало другим.
+
+        Правки на месте (game.curr_generation[i][j] = 1) движок не замечает:
+        хеш поколения для поиска циклов пересчитывается только после
+        присваивания или set_alive, а не перед каждым шагом. Поэтому после
+        таких правок нужно присвоить поле заново. Движкам, которые хранят
+        клетки иначе (SparseLife, PackedLife, HashLife), curr_generation
+        отдает копию, и правки на месте в них вовсе не попадают.
+        """
+        return self._curr_generation
+
+    @curr_generation.setter
+    def curr_generation(self, grid: Board) -> None:
+        self._curr_generation = grid
+        self.edited = True
+
+    @property
+    def prev_generation(self) -> Board:
+        """
+        Предыдущее поколение клеток.
+        """
+        return self._prev_generation
+
     def get_neighbours(self, cell: Cell) -> Cells:
         # Copy from previous assignment
         neighbours = []
@@ -45,7 +117,7 @@ class GameOfLife:
                     neighbours.append(self.curr_generation[i][j])
         return neighbours
 
-    def get_next_generation(self) -> Grid:
+    def get_next_generation(self) -> Board:
         # Copy from previous assignment
         grid_update = self.create_grid()
         for y in range(self.rows):
@@ -58,13 +130,63 @@ class GameOfLife:
                     grid_update[y][x] = 1
         return grid_update
 
+    def update_generation(self) -> None:
+        self._prev_generation = self.curr_generation[:]
+        self.curr_generation = self.get_next_generation()
+
     def step(self) -> None:
         """
         Выполнить один шаг игры.
         """
-        self.prev_generation = self.curr_generation[:]
-        self.curr_generation = self.get_next_generation()
+        self.sync_history()
+        self.update_generation()
         self.generations += 1
+        self.remember(self.fingerprint())
+
+    def fingerprint(self) -> tp.Hashable:
+        """
+        Хеш текущего поколения.
+        """
+        return _digest(b"".join(map(bytes, self.curr_generation)))
+
+    def reset_history(self) -> None:
+        # Поколения по хешам и номер поколения, с которого начинается цикл, и его период
+        self.history: tp.Dict[tp.Hashable, int] = {}
+        self.cycle_start: tp.Optional[int] = None
+        self.period: tp.Optional[int] = None
+        self.prev_key: tp.Optional[tp.Hashable] = None
+        self.curr_key: tp.Optional[tp.Hashable] = None
+        # Менялось ли поле через curr_generation или set_alive после remember:
+        # пока нет, curr_key - хеш текущего поколения, и пересчитывать его не нужно.
+        # Клетки, измененные на месте, здесь не видны
+        self.edited = True
+
+    def sync_history(self) -> None:
+        if not self.edited:
+            return
+        key = self.fingerprint()
+        if key != self.curr_key:
+            # Поле изменили между шагами, и прежняя история к нему не относится
+            self.reset_history()
+            self.remember(key)
+        self.edited = False
+
+    def remember(self, key: tp.Hashable) -> None:
+        """
+        Запомнить хеш текущего поколения. Если такое поколение уже было,
+        найден цикл: cycle_start больше не None, а period - его длина в
+        поколениях (HashLife после прыжков разной длины оставляет period
+        неизвестным, см. HashLife.advance). Циклы длиннее history_size
+        поколений не находятся.
+        """
+        start = self.history.pop(key, None)
+        if start is not None and self.cycle_start is None:
+            self.cycle_start, self.period = start, self.generations - start
+        self.history[key] = self.generations
+        if len(self.history) > self.history_size:
+            del self.history[next(iter(self.history))]
+        self.prev_key, self.curr_key = self.curr_key, key
+        self.edited = False
 
     @property
     def is_max_generations_exceeded(self) -> bool:
@@ -78,35 +200,753 @@ class GameOfLife:
         """
         Изменилось ли состояние клеток с предыдущего шага.
         """
-        return True if self.prev_generation != self.curr_generation else False
+        return self.prev_key is None or self.prev_key != self.curr_key
 
-    @staticmethod
-    def from_file(filename: pathlib.Path) -> "GameOfLife":
+    def set_alive(self, cells: tp.Iterable[Cell]) -> None:
         """
-        Прочитать состояние клеток из указанного файла.
+        Заменить живые клетки поля на указанные.
         """
-        file = open(filename, "a+")
-        read_grid = file.read().split("\n")
-        file.close()
-        grid = []
-        width = len(read_grid[0])
-        height = len(read_grid)
-        for line in read_grid:
-            cells = []
-            for symbol in line:
-                cells.append(int(symbol))
-            grid.append(cells)
-        game_file = GameOfLife((height, width), False)
-        game_file.curr_generation = grid[:]
-        return game_file
+        grid = self.create_grid()
+        for row, col in cells:
+            grid[row][col] = 1
+        self.curr_generation = grid
+
+    def set_runs(self, runs: tp.Iterable[patterns.Run]) -> None:
+        """
+        Заменить живые клетки поля на серии клеток (см. patterns.Run). Клетки
+        за правым краем поля отбрасываются.
+        """
+        grid = self.create_grid()
+        for row, col, length in runs:
+            stop = min(col + length, self.cols)
+            grid[row][col:stop] = [1] * (stop - col)
+        self.curr_generation = grid
+
+    def alive_cells(self) -> tp.Iterator[Cell]:
+        """
+        Живые клетки текущего поколения.
+        """
+        for i, row in enumerate(self.curr_generation):
+            for j, value in enumerate(row):
+                if value:
+                    yield i, j
+
+    def changed_cells(self) -> tp.Iterator[Cell]:
+        """
+        Клетки, которые отличаются в предыдущем и текущем поколениях.
+        """
+        for i, (old, new) in enumerate(zip(self.prev_generation, self.curr_generation)):
+            for j, (a, b) in enumerate(zip(old, new)):
+                if a != b:
+                    yield i, j
+
+    @classmethod
+    def from_file(cls: tp.Type[G], filename: pathlib.Path) -> G:
+        """
+        Прочитать состояние клеток из указанного файла. Формат выбирается по
+        расширению: .rle - RLE, .lif и .life - Life 1.06, остальные - поле из
+        нулей и единиц. Серии клеток читаются из файла по мере заполнения поля
+        и заполняют его целиком, без перебора клеток по одной.
+        """
+        path = pathlib.Path(filename)
+        read = patterns.READERS.get(path.suffix.lower(), patterns.read_plain)
+        with path.open() as file:
+            size, runs = read(file)
+            game = cls(size, False)
+            game.set_runs(runs)
+        return game
 
     def save(self, filename: pathlib.Path) -> None:
         """
-        Сохранить текущее состояние клеток в указанный файл.
+        Сохранить текущее состояние клеток в указанный файл, в формате по
+        расширению, как в from_file.
         """
-        file = open(filename, "w")
-        for i in range(self.rows):
-            for j in range(self.cols):
-                file.write(str(self.curr_generation[i][j]))
-            file.write("\n")
-        file.close()
+        path = pathlib.Path(filename)
+        suffix = path.suffix.lower()
+        with path.open("w") as file:
+            if suffix == ".rle":
+                patterns.write_rle(file, self.alive_cells(), (self.rows, self.cols))
+            elif suffix in (".lif", ".life"):
+                patterns.write_life106(file, self.alive_cells())
+            else:
+                self.write_plain(file)
+
+    def write_plain(self, file: tp.TextIO) -> None:
+        for row in self.curr_generation:
+            file.write("".join(map(str, row)) + "\n")
+
+
+def _zobrist(cells: tp.Collection[int]) -> int:
+    """xor 64-битных ключей клеток; ключ - номер клетки, перемешанный как в splitmix64"""
+    if np is None or len(cells) < 1024:
+        return functools.reduce(operator.xor, map(_mix, cells), 0)
+    # Большие множества, например при загрузке поля, перемешиваются в NumPy
+    x = np.fromiter(cells, dtype=np.uint64, count=len(cells))
+    x *= np.uint64(0x9E3779B97F4A7C15)
+    x ^= x >> np.uint64(30)
+    x *= np.uint64(0xBF58476D1CE4E5B9)
+    x ^= x >> np.uint64(27)
+    x *= np.uint64(0x94D049BB133111EB)
+    x ^= x >> np.uint64(31)
+    return int(np.bitwise_xor.reduce(x))
+
+
+def _mix(x: int) -> int:
+    x = (x * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return x ^ (x >> 31)
+
+
+class SparseLife(GameOfLife):
+    """
+    Движок для больших разреженных полей: хранятся только живые клетки, а на
+    каждом шаге пересчитываются лишь клетки, изменившиеся на прошлом шаге, и
+    их соседи. Остальные клетки не могут измениться, потому что их окрестность
+    осталась прежней, поэтому шаг стоит пропорционально активности, а не
+    площади поля.
+
+    Клетки хранятся номерами в поле, окруженном рамкой из мертвых клеток
+    шириной в одну клетку: так у соседей любой клетки поля есть номера, и
+    соседи на краю не переходят на другую строку.
+    """
+
+    def __init__(
+        self,
+        size: tp.Tuple[int, int],
+        randomize: bool = True,
+        max_generations: tp.Optional[float] = float("inf"),
+    ) -> None:
+        self.rows, self.cols = size
+        self.stride = self.cols + 2
+        s = self.stride
+        self.offsets = (-s - 1, -s, -s + 1, -1, 1, s - 1, s, s + 1)
+        # Номера живых клеток
+        self.alive: tp.Set[int] = set()
+        # Клетки, изменившиеся на последнем шаге
+        self.changed: tp.Set[int] = set()
+        # Клетки, чья окрестность могла измениться: их и соседей надо пересчитать
+        self.dirty: tp.Set[int] = set()
+        # Хеш Зобриста: xor ключей живых клеток, обновляется по изменениям
+        self.zobrist = 0
+        if randomize:
+            self.curr_generation = self.create_grid(randomize=True)
+        self.max_generations = max_generations
+        self.generations = 1
+        self.reset_history()
+
+    def index(self, cell: Cell) -> int:
+        return (cell[0] + 1) * self.stride + cell[1] + 1
+
+    def cell(self, index: int) -> Cell:
+        row, col = divmod(index, self.stride)
+        return row - 1, col - 1
+
+    def to_grid(self, alive: tp.Set[int]) -> Board:
+        grid = self.create_grid()
+        for index in alive:
+            row, col = self.cell(index)
+            grid[row][col] = 1
+        return grid
+
+    @property
+    def curr_generation(self) -> Board:
+        return self.to_grid(self.alive)
+
+    @curr_generation.setter
+    def curr_generation(self, grid: Board) -> None:
+        self.set_alive((i, j) for i, row in enumerate(grid) for j, value in enumerate(row) if value)
+
+    def set_alive(self, cells: tp.Iterable[Cell]) -> None:
+        """
+        Заменить живые клетки поля на указанные, не создавая полную сетку.
+        """
+        self.replace_alive({self.index(cell) for cell in cells})
+
+    def set_runs(self, runs: tp.Iterable[patterns.Run]) -> None:
+        alive: tp.Set[int] = set()
+        for row, col, length in runs:
+            start = self.index((row, col))
+            alive.update(range(start, start + min(length, self.cols - col)))
+        self.replace_alive(alive)
+
+    def replace_alive(self, alive: tp.Set[int]) -> None:
+        self.changed = alive ^ self.alive
+        self.dirty = alive | self.alive
+        self.alive = alive
+        self.zobrist = _zobrist(alive)
+        self.edited = True
+
+    def alive_cells(self) -> tp.Iterator[Cell]:
+        return map(self.cell, self.alive)
+
+    def changed_cells(self) -> tp.Iterator[Cell]:
+        return map(self.cell, self.changed)
+
+    @property
+    def prev_generation(self) -> Board:
+        return self.to_grid(self.alive ^ self.changed)
+
+    def get_neighbours(self, cell: Cell) -> Cells:
+        x, y = cell
+        return [
+            int(self.index((i, j)) in self.alive)
+            for i in range(max(0, x - 1), min(self.rows, x + 2))
+            for j in range(max(0, y - 1), min(self.cols, y + 2))
+            if (i, j) != (x, y)
+        ]
+
+    def get_changes(self) -> tp.Set[int]:
+        """
+        Клетки, которые изменятся на следующем шаге.
+        """
+        alive, offsets, stride = self.alive, self.offsets, self.stride
+        candidates = set()
+        for index in self.dirty:
+            candidates.add(index)
+            candidates.update([index + offset for offset in offsets])
+        changes = set()
+        for index in candidates:
+            row, col = divmod(index, stride)
+            if not (0 < row <= self.rows and 0 < col <= self.cols):
+                continue
+            count = 0
+            for offset in offsets:
+                if index + offset in alive:
+                    count += 1
+            if index in alive:
+                if count != 2 and count != 3:
+                    changes.add(index)
+            elif count == 3:
+                changes.add(index)
+        return changes
+
+    def get_next_generation(self) -> Board:
+        return self.to_grid(self.alive ^ self.get_changes())
+
+    def update_generation(self) -> None:
+        changes = self.get_changes()
+        self.alive ^= changes
+        self.changed = self.dirty = changes
+        self.zobrist ^= _zobrist(changes)
+
+    def fingerprint(self) -> tp.Hashable:
+        return self.zobrist
+
+
+def _cell_arrays(cells: tp.Iterable[Cell]) -> tp.Tuple[tp.Any, tp.Any]:
+    """Номера строк и столбцов клеток двумя массивами, без списка кортежей"""
+    flat = np.fromiter(itertools.chain.from_iterable(cells), dtype=np.int64)
+    return flat[0::2], flat[1::2]
+
+
+def _run_chunks(runs: tp.Iterable[patterns.Run], cols: int) -> tp.Iterator[tp.Any]:
+    """
+    Серии клеток кусками, тремя массивами: строки, первые столбцы и длины,
+    обрезанные по правому краю поля. В куске не больше 2**20 клеток поля
+    шириной cols, чтобы развернутые серии не занимали много памяти.
+    """
+    runs = iter(runs)
+    count = min(max((1 << 20) // max(cols, 1), 1), 1 << 16)
+    while True:
+        chunk = itertools.chain.from_iterable(itertools.islice(runs, count))
+        flat = np.fromiter(chunk, dtype=np.int64)
+        if not flat.size:
+            return
+        rows, starts, lengths = flat[0::3], flat[1::3], flat[2::3]
+        yield rows, starts, np.maximum(np.minimum(lengths, cols - starts), 0)
+
+
+def _ranges(starts: tp.Any, lengths: tp.Any) -> tp.Tuple[tp.Any, tp.Any]:
+    """
+    Промежутки start..start + length подряд одним массивом, и для каждого
+    числа - номер его промежутка.
+    """
+    ends = np.cumsum(lengths)
+    owners = np.repeat(np.arange(lengths.size), lengths)
+    return owners, np.arange(ends[-1] if ends.size else 0) + (starts - ends + lengths)[owners]
+
+
+def _cells_of(grid: "npt.NDArray[tp.Any]") -> tp.Iterator[Cell]:
+    """Клетки с ненулевыми значениями в массиве grid"""
+    return ((row, col) for row, col in np.argwhere(grid).tolist())
+
+
+def _next_rows(grid: tp.Any, start: int, stop: int) -> tp.Any:
+    """
+    Строки start..stop следующего поколения массива grid. Соседние строки
+    сверху и снизу читаются из grid, за краем поля клетки мертвые.
+    """
+    rows, cols = grid.shape
+    block = np.zeros((stop - start + 2, cols + 2), dtype=np.uint8)
+    lo, hi = max(start - 1, 0), min(stop + 1, rows)
+    block[lo - start + 1 : hi - start + 1, 1:-1] = grid[lo:hi]
+    vertical = block[:-2] + block[1:-1] + block[2:]
+    box = vertical[:, :-2] + vertical[:, 1:-1] + vertical[:, 2:]
+    return ((box == 3) | ((box == 4) & (block[1:-1, 1:-1] == 1))).view(np.uint8)
+
+
+class NumpyLife(GameOfLife):
+    """
+    Движок на NumPy: поколение хранится двумерным массивом uint8, а шаг
+    считается целиком над массивом. Сумма квадрата 3x3 вокруг каждой клетки
+    складывается из сдвинутых срезов сначала по строкам, потом по столбцам
+    (см. _next_rows);
+    клетка жива в следующем поколении, если сумма равна 3, или если сумма
+    равна 4 и сама клетка жива.
+    """
+
+    def __init__(
+        self,
+        size: tp.Tuple[int, int],
+        randomize: bool = True,
+        max_generations: tp.Optional[float] = float("inf"),
+    ) -> None:
+        if np is None:
+            raise ImportError("NumpyLife requires NumPy")
+        super().__init__(size, randomize, max_generations)
+
+    # Поколения хранятся массивами, а не списками строк, как в GameOfLife
+    _curr_generation: "npt.NDArray[np.uint8]"
+    _prev_generation: "npt.NDArray[np.uint8]"
+
+    def create_grid(self, randomize: bool = False) -> "npt.NDArray[np.uint8]":
+        if randomize:
+            # Генератор NumPy засевается из random, чтобы random.seed делал поле воспроизводимым
+            rng = np.random.default_rng(random.getrandbits(64))
+            return rng.integers(0, 2, (self.rows, self.cols), dtype=np.uint8)
+        return np.zeros((self.rows, self.cols), dtype=np.uint8)
+
+    @property
+    def curr_generation(self) -> Board:
+        return self._curr_generation
+
+    @curr_generation.setter
+    def curr_generation(self, grid: Board) -> None:
+        self._curr_generation = np.asarray(grid, dtype=np.uint8)
+        self.edited = True
+
+    def get_next_generation(self) -> Board:
+        return _next_rows(self._curr_generation, 0, self.rows)
+
+    def set_alive(self, cells: tp.Iterable[Cell]) -> None:
+        grid = self.create_grid()
+        rows, cols = _cell_arrays(cells)
+        grid[rows, cols] = 1
+        self.curr_generation = grid
+
+    def set_runs(self, runs: tp.Iterable[patterns.Run]) -> None:
+        grid = self.create_grid()
+        flat = grid.reshape(-1)
+        for rows, starts, lengths in _run_chunks(runs, self.cols):
+            flat[_ranges(rows * self.cols + starts, lengths)[1]] = 1
+        self.curr_generation = grid
+
+    def alive_cells(self) -> tp.Iterator[Cell]:
+        return _cells_of(np.asarray(self.curr_generation))
+
+    def changed_cells(self) -> tp.Iterator[Cell]:
+        changed = np.asarray(self.prev_generation) != np.asarray(self.curr_generation)
+        return _cells_of(changed)
+
+    def fingerprint(self) -> tp.Hashable:
+        return _digest(self._curr_generation.tobytes())
+
+    def write_plain(self, file: tp.TextIO) -> None:
+        for row in np.asarray(self.curr_generation) + ord("0"):
+            file.write(row.tobytes().decode("ascii") + "\n")
+
+
+class PackedLife(NumpyLife):
+    """
+    Движок для очень больших полей: каждая строка упакована в слова uint64
+    по 64 клетки, бит j слова k - клетка 64 * k + j. Соседи считаются сразу
+    для всех клеток слова побитовыми сумматорами: сдвигами слов получаются
+    соседи слева и справа, горизонтальные суммы троек и пар складываются по
+    вертикали в трехбитный счетчик. Поле 20000x20000 занимает 50 МБ.
+
+    Шаг считается полосами по stripe строк, чтобы временные массивы не
+    превышали размера полосы.
+    """
+
+    def __init__(
+        self,
+        size: tp.Tuple[int, int],
+        randomize: bool = True,
+        max_generations: tp.Optional[float] = float("inf"),
+        stripe: int = 1024,
+    ) -> None:
+        if np is None:
+            raise ImportError("PackedLife requires NumPy")
+        self.rows, self.cols = size
+        self.stripe = stripe
+        n_words = (self.cols + 63) // 64
+        # Биты за правым краем поля всегда нулевые
+        self.mask = np.full(n_words, np.iinfo(np.uint64).max, dtype=np.uint64)
+        if self.cols % 64:
+            self.mask[-1] = np.uint64((1 << (self.cols % 64)) - 1)
+        self.prev_words = np.zeros((self.rows, n_words), dtype=np.uint64)
+        self.words = np.zeros((self.rows, n_words), dtype=np.uint64)
+        if randomize:
+            rng = np.random.default_rng(random.getrandbits(64))
+            self.words = rng.integers(
+                0, np.iinfo(np.uint64).max, (self.rows, n_words), dtype=np.uint64, endpoint=True
+            )
+            self.words &= self.mask
+        self.max_generations = max_generations
+        self.generations = 1
+        self.reset_history()
+
+    def pack(self, grid: Board) -> tp.Any:
+        cells = np.asarray(grid, dtype=np.uint8).reshape(self.rows, self.cols)
+        packed = np.packbits(cells, axis=1, bitorder="little")
+        words = np.zeros((self.rows, self.mask.size * 8), dtype=np.uint8)
+        words[:, : packed.shape[1]] = packed
+        return words.view("<u8").astype(np.uint64)
+
+    def unpack(self, words: tp.Any) -> "npt.NDArray[np.uint8]":
+        cells = np.unpackbits(words.astype("<u8").view(np.uint8), axis=1, bitorder="little")
+        return cells[:, : self.cols]
+
+    @property
+    def curr_generation(self) -> Board:
+        return self.unpack(self.words)
+
+    @curr_generation.setter
+    def curr_generation(self, grid: Board) -> None:
+        self.words = self.pack(grid)
+        self.edited = True
+
+    @property
+    def prev_generation(self) -> Board:
+        return self.unpack(self.prev_words)
+
+    def get_cell(self, cell: Cell) -> int:
+        row, col = cell
+        return int(self.words[row, col >> 6] >> np.uint64(col & 63)) & 1
+
+    def get_neighbours(self, cell: Cell) -> Cells:
+        x, y = cell
+        return [
+            self.get_cell((i, j))
+            for i in range(max(0, x - 1), min(self.rows, x + 2))
+            for j in range(max(0, y - 1), min(self.cols, y + 2))
+            if (i, j) != (x, y)
+        ]
+
+    def get_next_words(self) -> tp.Any:
+        words, rows, n_words = self.words, self.rows, self.mask.size
+        one, high = np.uint64(1), np.uint64(63)
+        result = np.empty_like(words)
+        for start in range(0, rows, self.stripe):
+            stop = min(start + self.stripe, rows)
+            # Полоса с соседними строками сверху и снизу, за краем поля - нули
+            block = np.zeros((stop - start + 2, n_words), dtype=np.uint64)
+            lo, hi = max(start - 1, 0), min(stop + 1, rows)
+            block[lo - start + 1 : hi - start + 1] = words[lo:hi]
+            # Соседи слева и справа: биты переходят через границы слов
+            west = block << one
+            west[:, 1:] |= block[:, :-1] >> high
+            east = block >> one
+            east[:, :-1] |= block[:, 1:] << high
+            # Двухбитные суммы: соседи слева и справа, и они же вместе с клеткой
+            pair0, pair1 = west ^ east, west & east
+            triple0, triple1 = pair0 ^ block, pair1 | (pair0 & block)
+            # Сверху и снизу тройки, в своей строке - пара
+            a0, a1, b0, b1 = triple0[:-2], triple1[:-2], triple0[2:], triple1[2:]
+            c0, c1 = pair0[1:-1], pair1[1:-1]
+            s0, carry = a0 ^ b0, a0 & b0
+            s1 = a1 ^ b1 ^ carry
+            s2 = (a1 & b1) | (carry & (a1 ^ b1))
+            r0, carry = s0 ^ c0, s0 & c0
+            r1 = s1 ^ c1 ^ carry
+            r2 = s2 ^ ((s1 & c1) | (carry & (s1 ^ c1)))
+            # Счетчик по модулю 8: 3 - рождение или выживание, 2 - выживание
+            result[start:stop] = r1 & ~r2 & (r0 | block[1:-1]) & self.mask
+        return result
+
+    def get_next_generation(self) -> Board:
+        return self.unpack(self.get_next_words())
+
+    def update_generation(self) -> None:
+        self.prev_words = self.words
+        self.words = self.get_next_words()
+
+    def set_alive(self, cells: tp.Iterable[Cell]) -> None:
+        # Биты ставятся прямо в слова, поле целиком не распаковывается
+        rows, cols = _cell_arrays(cells)
+        words = np.zeros_like(self.words)
+        bits = np.left_shift(np.uint64(1), (cols & 63).astype(np.uint64))
+        np.bitwise_or.at(words, (rows, cols >> 6), bits)
+        self.words = words
+        self.edited = True
+
+    def set_runs(self, runs: tp.Iterable[patterns.Run]) -> None:
+        # Серия делится на куски по словам, каждый кусок - одна маска битов
+        words = np.zeros_like(self.words)
+        full = np.iinfo(np.uint64).max
+        for rows, starts, lengths in _run_chunks(runs, self.cols):
+            nonempty = lengths > 0
+            rows, starts, ends = rows[nonempty], starts[nonempty], (starts + lengths)[nonempty]
+            first = starts >> 6
+            owners, k = _ranges(first, ((ends - 1) >> 6) - first + 1)
+            lo = np.maximum(starts[owners], k << 6) - (k << 6)
+            hi = np.minimum(ends[owners], (k + 1) << 6) - (k << 6)
+            bits = (full >> (64 - hi + lo).astype(np.uint64)) << lo.astype(np.uint64)
+            np.bitwise_or.at(words, (rows[owners], k), bits)
+        self.words = words
+        self.edited = True
+
+    def alive_cells(self) -> tp.Iterator[Cell]:
+        for start in range(0, self.rows, self.stripe):
+            cells = self.unpack(self.words[start : start + self.stripe])
+            for row, col in np.argwhere(cells).tolist():
+                yield start + row, col
+
+    def changed_cells(self) -> tp.Iterator[Cell]:
+        for start in range(0, self.rows, self.stripe):
+            stop = start + self.stripe
+            cells = self.unpack(self.words[start:stop] ^ self.prev_words[start:stop])
+            for row, col in np.argwhere(cells).tolist():
+                yield start + row, col
+
+    def fingerprint(self) -> tp.Hashable:
+        return _digest(self.words.tobytes())
+
+    def write_plain(self, file: tp.TextIO) -> None:
+        for start in range(0, self.rows, self.stripe):
+            cells = np.asarray(self.unpack(self.words[start : start + self.stripe]))
+            for row in cells + ord("0"):
+                file.write(row.tobytes().decode("ascii") + "\n")
+
+
+class HashLife(GameOfLife):
+    """
+    Движок HashLife (см. hashlife.QuadTree) для очень долгих прогонов:
+    advance(2 ** k) перескакивает 2**k поколений за один вызов, а step -
+    частный случай advance(1).
+
+    В отличие от остальных движков поле бесконечно: rows и cols задают только
+    видимую область curr_generation, клетки за ее краем продолжают жить.
+    Чтобы память не росла бесконечно, таблица узлов собирается, как только
+    превысит max_nodes (см. hashlife.QuadTree.advance): в ней остаются
+    текущий и предыдущий узоры и узоры из истории поколений.
+    """
+
+    def __init__(
+        self,
+        size: tp.Tuple[int, int],
+        randomize: bool = True,
+        max_generations: tp.Optional[float] = float("inf"),
+        max_nodes: int = 1 << 20,
+    ) -> None:
+        self.rows, self.cols = size
+        self.tree = hashlife.QuadTree(max_nodes)
+        self.root = self.prev_root = self.tree.from_cells([])
+        if randomize:
+            self.curr_generation = self.create_grid(randomize=True)
+        self.max_generations = max_generations
+        self.generations = 1
+        self.reset_history()
+
+    def to_grid(self, root: hashlife.Node) -> Board:
+        grid = self.create_grid()
+        for row, col in self.tree.cells(root, window=(0, 0, self.rows, self.cols)):
+            grid[row][col] = 1
+        return grid
+
+    @property
+    def curr_generation(self) -> Board:
+        return self.to_grid(self.root)
+
+    @curr_generation.setter
+    def curr_generation(self, grid: Board) -> None:
+        self.set_alive((i, j) for i, row in enumerate(grid) for j, value in enumerate(row) if value)
+
+    @property
+    def prev_generation(self) -> Board:
+        return self.to_grid(self.prev_root)
+
+    def set_alive(self, cells: tp.Iterable[Cell]) -> None:
+        """
+        Заменить живые клетки на указанные, не создавая полную сетку.
+        """
+        self.prev_root, self.root = self.root, self.tree.from_cells(cells)
+        self.edited = True
+
+    def set_runs(self, runs: tp.Iterable[patterns.Run]) -> None:
+        self.prev_root, self.root = self.root, self.tree.from_runs(runs)
+        self.edited = True
+
+    def alive_cells(self) -> tp.Iterator[Cell]:
+        return self.tree.cells(self.root, window=(0, 0, self.rows, self.cols))
+
+    def changed_cells(self) -> tp.Iterator[Cell]:
+        window = (0, 0, self.rows, self.cols)
+        prev = set(self.tree.cells(self.prev_root, window=window))
+        return iter(prev.symmetric_difference(self.tree.cells(self.root, window=window)))
+
+    @property
+    def population(self) -> int:
+        return self.root.population
+
+    def get_neighbours(self, cell: Cell) -> Cells:
+        x, y = cell
+        alive = set(self.tree.cells(self.root, window=(x - 1, y - 1, x + 2, y + 2)))
+        return [
+            int((i, j) in alive)
+            for i in range(max(0, x - 1), min(self.rows, x + 2))
+            for j in range(max(0, y - 1), min(self.cols, y + 2))
+            if (i, j) != (x, y)
+        ]
+
+    def get_next_generation(self) -> Board:
+        return self.to_grid(self.tree.advance(self.root, 1))
+
+    def reset_history(self) -> None:
+        super().reset_history()
+        # Длина прыжков advance с начала истории: None - прыжков не было, 0 - разные
+        self.jump: tp.Optional[int] = None
+
+    def advance(self, generations: int) -> None:
+        """
+        Перескочить сразу на generations >= 1 поколений. Цикл при этом ищется
+        только среди поколений, на которые пришлись прыжки.
+
+        Если с начала истории все прыжки одной длины, period - число
+        поколений между совпавшими узорами, общее кратное настоящего периода
+        и длины прыжка (при step - сам период). После прыжков разной длины
+        совпадение говорит лишь о том, что цикл есть: cycle_start
+        записывается, а period остается None.
+        """
+        if generations < 1:
+            raise ValueError(f"generations must be positive, got {generations}")
+        self.sync_history()
+        self.prev_root = self.root
+        # Узлы из истории тоже должны остаться каноническими
+        keep = [self.prev_root]
+        keep.extend(key for key in self.history if isinstance(key, hashlife.Node))
+        self.root = self.tree.advance(self.root, generations, keep)
+        self.generations += generations
+        self.jump = generations if self.jump in (None, generations) else 0
+        found = self.cycle_start is not None
+        self.remember(self.root)
+        if not found and self.cycle_start is not None and not self.jump:
+            self.period = None
+
+    def step(self) -> None:
+        """
+        Выполнить один шаг игры.
+        """
+        self.advance(1)
+
+    def fingerprint(self) -> tp.Hashable:
+        # Узлы канонические, поэтому одинаковые узоры - это один и тот же узел
+        return self.root
+
+
+# Разделяемые поля в процессах ParallelLife
+_shared: tp.Dict[str, tp.Any] = {}
+
+
+def _attach_shared(names: tp.List[str], shape: tp.Tuple[int, int]) -> None:
+    buffers = [SharedMemory(name=name) for name in names]
+    _shared["buffers"] = buffers
+    _shared["grids"] = [np.ndarray(shape, dtype=np.uint8, buffer=b.buf) for b in buffers]
+
+
+def _step_stripe(src: int, start: int, stop: int) -> bytes:
+    """Считает полосу строк следующего поколения, возвращает ее хеш"""
+    grids = _shared["grids"]
+    rows = _next_rows(grids[src], start, stop)
+    grids[1 - src][start:stop] = rows
+    return _digest(rows.tobytes())
+
+
+def _release_shared(pool: tp.Any, buffers: tp.List[SharedMemory]) -> None:
+    pool.terminate()
+    pool.join()
+    for buffer in buffers:
+        try:
+            buffer.close()
+        except BufferError:
+            # На память еще ссылаются массивы; она освободится вместе с ними
+            pass
+        buffer.unlink()
+
+
+class ParallelLife(NumpyLife):
+    """
+    Многопроцессный движок для очень больших полей. Поле лежит в двух буферах
+    разделяемой памяти (текущее и следующее поколения) и делится на полосы
+    строк по числу процессов; каждый процесс считает свою полосу, читая
+    граничные строки соседних полос прямо из текущего буфера, после чего
+    буферы меняются ролями. Хеши полос процессы тоже считают сами.
+
+    Пул процессов и разделяемую память нужно освободить вызовом close или
+    используя движок как контекстный менеджер.
+    """
+
+    def __init__(
+        self,
+        size: tp.Tuple[int, int],
+        randomize: bool = True,
+        max_generations: tp.Optional[float] = float("inf"),
+        workers: tp.Optional[int] = None,
+    ) -> None:
+        if np is None:
+            raise ImportError("ParallelLife requires NumPy")
+        rows, cols = size
+        self.workers = workers or os.cpu_count() or 1
+        self.buffers = [SharedMemory(create=True, size=max(rows * cols, 1)) for _ in range(2)]
+        self.grids = [np.ndarray((rows, cols), dtype=np.uint8, buffer=b.buf) for b in self.buffers]
+        self.current = 0
+        # Хеш текущего поколения, посчитанный процессами на последнем шаге
+        self.key: tp.Optional[bytes] = None
+        bounds = [rows * k // self.workers for k in range(self.workers + 1)]
+        self.stripes = [(start, stop) for start, stop in zip(bounds, bounds[1:]) if start < stop]
+        self.pool = multiprocessing.Pool(
+            self.workers, _attach_shared, ([b.name for b in self.buffers], (rows, cols))
+        )
+        self.finalizer = weakref.finalize(self, _release_shared, self.pool, self.buffers)
+        super().__init__(size, randomize, max_generations)
+
+    @property
+    def curr_generation(self) -> Board:
+        return self.grids[self.current]
+
+    @curr_generation.setter
+    def curr_generation(self, grid: Board) -> None:
+        self.grids[self.current][:] = grid
+        self.key = None
+        self.edited = True
+
+    @property
+    def prev_generation(self) -> Board:
+        return self.grids[1 - self.current]
+
+    def update_generation(self) -> None:
+        tasks = [(self.current, start, stop) for start, stop in self.stripes]
+        self.key = _digest(b"".join(self.pool.starmap(_step_stripe, tasks)))
+        self.current = 1 - self.current
+
+    def fingerprint(self) -> tp.Hashable:
+        if self.key is None:
+            grid = self.grids[self.current]
+            self.key = _digest(
+                b"".join(_digest(grid[start:stop].tobytes()) for start, stop in self.stripes)
+            )
+        return self.key
+
+    def close(self) -> None:
+        """
+        Остановить процессы и освободить разделяемую память.
+        """
+        del self.grids
+        self.finalizer()
+
+    def __enter__(self) -> "ParallelLife":
+        return self
+
+    def __exit__(self, *args: tp.Any) -> None:
+        self.close()
@@ -14,9 +14,10 @@ class Console(UI):
 
     def draw_grid(self, screen) -> None:
         """ Отобразить состояние клеток. """
+        grid = self.life.curr_generation
         for i in range(self.life.rows):
             for j in range(self.life.cols):
-                if self.life.curr_generation[i][j]:
+                if grid[i][j]:
                     screen.addstr(i + 1, j + 1, "*")
 
     def run(self) -> None:
@@ -24,7 +25,11 @@ class Console(UI):
         curses.curs_set(0)
         self.life.curr_generation = self.life.create_grid(True)
         running = True
-        while running and self.life.is_changing and not self.life.is_max_generations_exceeded:
+        # Поле, которое повторяет одно из прошлых поколений (cycle_start не None), дальше
+        # будет только повторяться
+        while (
+            running and self.life.cycle_start is None and not self.life.is_max_generations_exceeded
+        ):
             screen.clear()
             self.draw_borders(screen)
             self.draw_grid(screen)
@@ -1,6 +1,8 @@
+import typing as tp
+
 import pygame
 
-from life import GameOfLife
+from life import Cell, GameOfLife
 from ui import UI
 
 
@@ -13,44 +15,68 @@ class GUI(UI):
         self.speed = speed
         self.screen = pygame.display.set_mode((self.width, self.height))
         self.pause = False
+        # Белое поле с сеткой, рисуется один раз
+        self.background: tp.Optional[pygame.Surface] = None
+        # Живые клетки, которые сейчас нарисованы на экране, и номер их поколения
+        self.shown: tp.Set[Cell] = set()
+        self.shown_generation: tp.Optional[int] = None
 
     def draw_lines(self) -> None:
-        for x in range(self.life.rows):
-            pygame.draw.line(
-                self.screen,
-                pygame.Color("black"),
-                (x * self.cell_size, 0),
-                (x * self.cell_size, self.height),
-            )
-        for y in range(self.life.cols):
-            pygame.draw.line(
-                self.screen,
-                pygame.Color("black"),
-                (0, y * self.cell_size),
-                (self.width, y * self.cell_size),
-            )
-
-    def draw_grid(self) -> None:
-        for i in range(self.life.rows):
-            for j in range(self.life.cols):
-                colors = (
-                    pygame.Color("Green")
-                    if self.life.curr_generation[i][j]
-                    else pygame.Color("white")
+        """
+        Отобразить пустое поле с сеткой. Сетка рисуется один раз в фоновую
+        поверхность, дальше фон только копируется на экран.
+        """
+        if self.background is None:
+            self.background = pygame.Surface((self.width, self.height))
+            self.background.fill(pygame.Color("white"))
+            for x in range(self.life.rows):
+                pygame.draw.line(
+                    self.background,
+                    pygame.Color("black"),
+                    (x * self.cell_size, 0),
+                    (x * self.cell_size, self.height),
                 )
-                sizes = self.cell_size
-                pygame.draw.rect(
-                    self.screen,
-                    colors,
-                    (i * sizes + 1, j * sizes + 1, sizes - 1, sizes - 1),
+            for y in range(self.life.cols):
+                pygame.draw.line(
+                    self.background,
+                    pygame.Color("black"),
+                    (0, y * self.cell_size),
+                    (self.width, y * self.cell_size),
                 )
+        self.screen.blit(self.background, (0, 0))
+        self.shown = set()
+        self.shown_generation = None
+
+    def draw_grid(self) -> tp.List[pygame.Rect]:
+        """
+        Перерисовать клетки, изменившиеся с прошлого вызова, и вернуть их
+        прямоугольники для pygame.display.update.
+        """
+        generation = self.life.generations
+        if self.shown_generation == generation:
+            changed: tp.Set[Cell] = set()
+        elif self.shown_generation == generation - 1:
+            # Ровно один шаг: изменения знает сам движок
+            changed = set(self.life.changed_cells())
+        else:
+            changed = self.shown.symmetric_difference(self.life.alive_cells())
+        self.shown ^= changed
+        self.shown_generation = generation
+        sizes = self.cell_size
+        born, died = changed & self.shown, changed - self.shown
+        return [
+            self.screen.fill(color, (i * sizes + 1, j * sizes + 1, sizes - 1, sizes - 1))
+            for cells, color in [(born, pygame.Color("Green")), (died, pygame.Color("white"))]
+            for i, j in cells
+        ]
 
     def run(self) -> None:
         # Copy from previous assignment
         pygame.init()
         clock = pygame.time.Clock()
         pygame.display.set_caption("Game of Life")
-        self.screen.fill(pygame.Color("white"))
+        self.draw_lines()
+        pygame.display.flip()
         running = True
         while running:
             for event in pygame.event.get():
@@ -64,13 +90,17 @@ class GUI(UI):
                         x, y = pygame.mouse.get_pos()
                         x //= self.cell_size
                         y //= self.cell_size
-                        self.life.curr_generation[x][y] = abs(self.life.curr_generation[x][y] - 1)
+                        # Поле присваивается целиком: движки, которые не хранят
+                        # сетку, отдают в curr_generation копию
+                        grid = self.life.curr_generation
+                        grid[x][y] = 1 - grid[x][y]
+                        self.life.curr_generation = grid
+                        self.shown_generation = None
 
-            self.draw_grid()
-            self.draw_lines()
+            # На экране обновляются только изменившиеся клетки
+            pygame.display.update(self.draw_grid())
             if not self.pause:
                 self.life.step()
-            pygame.display.flip()
             clock.tick(self.speed)
         pygame.quit()
 
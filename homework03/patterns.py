@@ -0,0 +1,200 @@
+import re
+import typing as tp
+
+Cell = tp.Tuple[int, int]
+Size = tp.Tuple[int, int]
+# Серия живых клеток подряд в одной строке: строка, первый столбец, длина
+Run = tp.Tuple[int, int, int]
+
+# Длина строки в RLE-файлах, как принято в Golly
+RLE_LINE_LENGTH = 70
+# Правило Конвея в двух принятых записях
+_CONWAY_RULES = {"b3/s23", "23/3"}
+_RLE_TOKEN = re.compile(r"(\d*)([^\d\s])")
+_PLAIN_RUN = re.compile(r"1+")
+
+
+def read_plain(lines: tp.Iterable[str]) -> tp.Tuple[Size, tp.Iterator[Run]]:
+    """
+    Поле из строк нулей и единиц; пустые строки пропускаются.
+
+    >>> size, runs = read_plain(["010", "001", "111", ""])
+    >>> size, list(runs)
+    ((3, 3), [(0, 1, 1), (1, 2, 1), (2, 0, 3)])
+    """
+    rows = [line.strip() for line in lines]
+    rows = [line for line in rows if line]
+    size = len(rows), max(map(len, rows), default=0)
+    return size, _plain_runs(rows)
+
+
+def _plain_runs(rows: tp.List[str]) -> tp.Iterator[Run]:
+    for i, line in enumerate(rows):
+        for match in _PLAIN_RUN.finditer(line):
+            yield i, match.start(), match.end() - match.start()
+
+
+def read_rle(lines: tp.Iterable[str]) -> tp.Tuple[Size, tp.Iterator[Run]]:
+    """
+    Узор в формате RLE. Заголовок читается сразу, чтобы узнать размер
+    поля, а серии клеток - по мере перебора, строка за строкой.
+
+    >>> size, runs = read_rle(["#N Glider", "x = 3, y = 3, rule = B3/S23", "bo$2bo$3o!"])
+    >>> size, list(runs)
+    ((3, 3), [(0, 1, 1), (1, 2, 1), (2, 0, 3)])
+    """
+    lines = iter(lines)
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            break
+    else:
+        raise ValueError("RLE header not found")
+    header = {}
+    for item in line.split(","):
+        key, _, value = item.partition("=")
+        header[key.strip().lower()] = value.strip()
+    if "x" not in header or "y" not in header:
+        raise ValueError(f"Invalid RLE header: {line!r}")
+    rule = header.get("rule", "B3/S23")
+    if rule.lower() not in _CONWAY_RULES:
+        raise ValueError(f"Unsupported rule {rule!r}, only B3/S23 is supported")
+    return (int(header["y"]), int(header["x"])), _rle_runs(lines)
+
+
+def _rle_runs(lines: tp.Iterator[str]) -> tp.Iterator[Run]:
+    row = col = 0
+    for line in lines:
+        if line.startswith("#"):
+            continue
+        for count, tag in _RLE_TOKEN.findall(line):
+            n = int(count) if count else 1
+            if tag == "b" or tag == ".":
+                col += n
+            elif tag == "$":
+                row += n
+                col = 0
+            elif tag == "!":
+                return
+            else:
+                # Все остальные состояния многоцветных правил считаются живыми
+                yield row, col, n
+                col += n
+
+
+def write_rle(file: tp.TextIO, cells: tp.Iterable[Cell], size: Size) -> None:
+    """
+    Записать узор в формате RLE.
+
+    >>> import io
+    >>> file = io.StringIO()
+    >>> write_rle(file, [(0, 1), (1, 2), (2, 0), (2, 1), (2, 2)], (3, 3))
+    >>> print(file.getvalue(), end="")
+    x = 3, y = 3, rule = B3/S23
+    bo$2bo$3o!
+    """
+    rows, cols = size
+    file.write(f"x = {cols}, y = {rows}, rule = B3/S23\n")
+    length = 0
+    for token in _rle_tokens(sorted(cells)):
+        if length + len(token) > RLE_LINE_LENGTH:
+            file.write("\n")
+            length = 0
+        file.write(token)
+        length += len(token)
+    file.write("\n")
+
+
+def _rle_tokens(cells: tp.List[Cell]) -> tp.Iterator[str]:
+    def run(count: int, tag: str) -> str:
+        return f"{count}{tag}" if count > 1 else tag
+
+    row = col = 0
+    i = 0
+    while i < len(cells):
+        r, c = cells[i]
+        # Серия живых клеток подряд в одной строке
+        j = i + 1
+        while j < len(cells) and cells[j] == (r, c + j - i):
+            j += 1
+        if r > row:
+            yield run(r - row, "$")
+            row, col = r, 0
+        if c > col:
+            yield run(c - col, "b")
+        yield run(j - i, "o")
+        col = c + j - i
+        i = j
+    yield "!"
+
+
+def read_life106(lines: tp.Iterable[str]) -> tp.Tuple[Size, tp.Iterator[Run]]:
+    """
+    Узор в формате Life 1.06: по строке "x y" на живую клетку. Если есть
+    отрицательные координаты, узор сдвигается в угол поля.
+
+    Размер поля известен только после всех клеток, поэтому файл читается
+    дважды: первый раз ради границ узора, второй - клетки по мере перебора.
+    Соседние клетки одной строки, идущие в файле подряд, склеиваются в серии.
+    Если lines нельзя перечитать, строки сначала собираются в список.
+
+    >>> size, runs = read_life106(["#Life 1.06", "0 -1", "1 0", "-1 1", "0 1", "1 1"])
+    >>> size, list(runs)
+    ((3, 3), [(0, 1, 1), (1, 2, 1), (2, 0, 3)])
+    """
+    if hasattr(lines, "seek"):
+        file = tp.cast(tp.TextIO, lines)
+        start = file.tell()
+
+        def reread() -> tp.Iterable[str]:
+            file.seek(start)
+            return file
+
+    else:
+        saved = lines if isinstance(lines, (list, tuple)) else list(lines)
+
+        def reread() -> tp.Iterable[str]:
+            return saved
+
+    top = left = 0
+    bottom = right = -1
+    for row, col in _life106_cells(reread()):
+        top, bottom = min(top, row), max(bottom, row)
+        left, right = min(left, col), max(right, col)
+    size = bottom - top + 1, right - left + 1
+    return size, _life106_runs(_life106_cells(reread()), top, left)
+
+
+def _life106_cells(lines: tp.Iterable[str]) -> tp.Iterator[Cell]:
+    for line in lines:
+        if line.startswith("#") or not line.strip():
+            continue
+        x, y = line.split()
+        yield int(y), int(x)
+
+
+def _life106_runs(cells: tp.Iterator[Cell], top: int, left: int) -> tp.Iterator[Run]:
+    row = col = length = 0
+    for r, c in cells:
+        r, c = r - top, c - left
+        if length and r == row and c == col + length:
+            length += 1
+            continue
+        if length:
+            yield row, col, length
+        row, col, length = r, c, 1
+    if length:
+        yield row, col, length
+
+
+def write_life106(file: tp.TextIO, cells: tp.Iterable[Cell]) -> None:
+    """
+    Записать узор в формате Life 1.06.
+    """
+    file.write("#Life 1.06\n")
+    for row, col in cells:
+        file.write(f"{col} {row}\n")
+
+
+# Форматы по расширению файла; остальные файлы - поле из нулей и единиц
+READERS = {".rle": read_rle, ".lif": read_life106, ".life": read_life106}
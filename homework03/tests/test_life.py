@@ -1,12 +1,17 @@
 import json
 import os
+import pathlib
 import random
+import tempfile
+import time
 import unittest
 
 import life
 
 
 class TestGameOfLife(unittest.TestCase):
+    engine = life.GameOfLife
+
     def setUp(self):
         self.grid = [
             [1, 1, 0, 0, 1, 1, 1, 1],
@@ -21,81 +26,81 @@ class TestGameOfLife(unittest.TestCase):
         self.max_generations = 18
 
     def test_can_create_an_empty_grid(self):
-        game = life.GameOfLife((3, 3))
+        game = self.engine((3, 3))
         grid = game.create_grid(randomize=False)
         self.assertEqual([[0, 0, 0], [0, 0, 0], [0, 0, 0]], grid)
 
     def test_can_create_a_random_grid(self):
-        game = life.GameOfLife((3, 3))
+        game = self.engine((3, 3))
         random.seed(12345)
         grid = game.create_grid(randomize=True)
         self.assertEqual([[1, 0, 1], [1, 0, 1], [1, 0, 1]], grid)
 
     def test_get_neighbours(self):
-        game = life.GameOfLife((self.rows, self.cols))
+        game = self.engine((self.rows, self.cols))
         game.curr_generation = self.grid
         neighbours = game.get_neighbours((2, 3))
         self.assertEqual(8, len(neighbours))
         self.assertEqual(4, sum(neighbours))
 
     def test_get_neighbours_for_upper_left_corner(self):
-        game = life.GameOfLife((self.rows, self.cols))
+        game = self.engine((self.rows, self.cols))
         game.curr_generation = self.grid
         neighbours = game.get_neighbours((0, 0))
         self.assertEqual(3, len(neighbours))
         self.assertEqual(2, sum(neighbours))
 
     def test_get_neighbours_for_upper_right_corner(self):
-        game = life.GameOfLife((self.rows, self.cols))
+        game = self.engine((self.rows, self.cols))
         game.curr_generation = self.grid
         neighbours = game.get_neighbours((0, 7))
         self.assertEqual(3, len(neighbours))
         self.assertEqual(2, sum(neighbours))
 
     def test_get_neighbours_for_lower_left_corner(self):
-        game = life.GameOfLife((self.rows, self.cols))
+        game = self.engine((self.rows, self.cols))
         game.curr_generation = self.grid
         neighbours = game.get_neighbours((5, 0))
         self.assertEqual(3, len(neighbours))
         self.assertEqual(2, sum(neighbours))
 
     def test_get_neighbours_for_lower_right_corner(self):
-        game = life.GameOfLife((self.rows, self.cols))
+        game = self.engine((self.rows, self.cols))
         game.curr_generation = self.grid
         neighbours = game.get_neighbours((5, 7))
         self.assertEqual(3, len(neighbours))
         self.assertEqual(1, sum(neighbours))
 
     def test_get_neighbours_for_upper_side(self):
-        game = life.GameOfLife((self.rows, self.cols))
+        game = self.engine((self.rows, self.cols))
         game.curr_generation = self.grid
         neighbours = game.get_neighbours((0, 3))
         self.assertEqual(5, len(neighbours))
         self.assertEqual(4, sum(neighbours))
 
     def test_get_neighbours_for_bottom_side(self):
-        game = life.GameOfLife((self.rows, self.cols))
+        game = self.engine((self.rows, self.cols))
         game.curr_generation = self.grid
         neighbours = game.get_neighbours((5, 3))
         self.assertEqual(5, len(neighbours))
         self.assertEqual(4, sum(neighbours))
 
     def test_get_neighbours_for_left_side(self):
-        game = life.GameOfLife((self.rows, self.cols))
+        game = self.engine((self.rows, self.cols))
         game.curr_generation = self.grid
         neighbours = game.get_neighbours((2, 0))
         self.assertEqual(5, len(neighbours))
         self.assertEqual(2, sum(neighbours))
 
     def test_get_neighbours_for_right_side(self):
-        game = life.GameOfLife((self.rows, self.cols))
+        game = self.engine((self.rows, self.cols))
         game.curr_generation = self.grid
         neighbours = game.get_neighbours((2, 7))
         self.assertEqual(5, len(neighbours))
         self.assertEqual(2, sum(neighbours))
 
     def test_can_update(self):
-        game = life.GameOfLife((self.rows, self.cols))
+        game = self.engine((self.rows, self.cols))
         game.curr_generation = self.grid
 
         tests_dir = os.path.dirname(__file__)
@@ -112,14 +117,14 @@ class TestGameOfLife(unittest.TestCase):
                 self.assertEqual(steps[step], game.curr_generation)
 
     def test_prev_generation_is_correct(self):
-        game = life.GameOfLife((self.rows, self.cols))
+        game = self.engine((self.rows, self.cols))
         game.curr_generation = self.grid
         game.step()
         self.assertEqual(game.prev_generation, self.grid)
 
     def test_is_max_generations_exceeded(self):
         max_generations = 4
-        game = life.GameOfLife((self.rows, self.cols), max_generations=max_generations)
+        game = self.engine((self.rows, self.cols), max_generations=max_generations)
         game.curr_generation = self.grid
         for _ in range(max_generations - 1):
             game.step()
@@ -127,14 +132,344 @@ class TestGameOfLife(unittest.TestCase):
         self.assertTrue(game.is_max_generations_exceeded)
 
     def test_is_changing(self):
-        game = life.GameOfLife((self.rows, self.cols))
+        game = self.engine((self.rows, self.cols))
         game.curr_generation = self.grid
         game.step()
         self.assertTrue(game.is_changing)
 
     def test_is_not_changing(self):
-        game = life.GameOfLife((self.rows, self.cols))
+        game = self.engine((self.rows, self.cols))
         game.curr_generation = self.grid
         for _ in range(self.max_generations + 1):
             game.step()
         self.assertFalse(game.is_changing)
+
+    def test_finds_still_life(self):
+        game = self.engine((self.rows, self.cols))
+        game.curr_generation = self.grid
+        while game.period is None:
+            game.step()
+        self.assertEqual(1, game.period)
+        self.assertEqual(19, game.cycle_start)
+        self.assertEqual(20, game.generations)
+        self.assertFalse(game.is_changing)
+
+    def test_finds_oscillator(self):
+        game = self.engine((5, 5), randomize=False)
+        game.curr_generation = [[0] * 5, [0] * 5, [0, 1, 1, 1, 0], [0] * 5, [0] * 5]
+        game.step()
+        self.assertIsNone(game.period)
+        game.step()
+        self.assertEqual(2, game.period)
+        self.assertEqual(1, game.cycle_start)
+        self.assertTrue(game.is_changing)
+
+        # Поле изменили между шагами: история начинается заново
+        game.curr_generation = [[0] * 5, [0, 1, 1, 0, 0], [0, 1, 1, 0, 0], [0] * 5, [0] * 5]
+        game.step()
+        self.assertEqual(1, game.period)
+        self.assertEqual(3, game.cycle_start)
+
+    def test_hashes_once_per_step(self):
+        game = self.engine((self.rows, self.cols))
+        game.curr_generation = self.grid
+        fingerprint = game.fingerprint
+        calls = []
+        game.fingerprint = lambda: calls.append(1) or fingerprint()
+        game.step()
+        # Поле задали перед шагом: его хеш тоже нужен
+        self.assertEqual(2, len(calls))
+        for _ in range(3):
+            game.step()
+        self.assertEqual(5, len(calls))
+
+    def test_changed_cells(self):
+        game = self.engine((self.rows, self.cols))
+        game.curr_generation = self.grid
+        game.step()
+        prev, curr = game.prev_generation, game.curr_generation
+        cells = [(i, j) for i in range(self.rows) for j in range(self.cols)]
+        self.assertEqual(
+            {(i, j) for i, j in cells if prev[i][j] != curr[i][j]}, set(game.changed_cells())
+        )
+
+    def test_save_and_load_formats(self):
+        random.seed(24)
+        grid = [[int(random.random() < 0.3) for _ in range(90)] for _ in range(20)]
+        # В формате Life 1.06 размер поля - по крайним живым клеткам
+        grid[0][89] = grid[19][0] = 1
+        game = self.engine((20, 90), randomize=False)
+        game.curr_generation = grid
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ["grid.txt", "grid.rle", "grid.lif"]:
+                with self.subTest(name=name):
+                    path = pathlib.Path(tmp) / name
+                    game.save(path)
+                    loaded = self.engine.from_file(path)
+                    self.assertEqual((20, 90), (loaded.rows, loaded.cols))
+                    self.assertEqual(grid, loaded.curr_generation)
+
+    def test_set_runs(self):
+        random.seed(25)
+        runs = [
+            (random.randrange(20), random.randrange(150), random.randrange(80)) for _ in range(40)
+        ]
+        # Серии через границы слов uint64, длиной в строку и за правым краем поля
+        runs += [(3, 60, 8), (5, 0, 150), (7, 140, 30), (9, 10, 0)]
+        grid = [[0] * 150 for _ in range(20)]
+        for row, col, length in runs:
+            for j in range(col, min(col + length, 150)):
+                grid[row][j] = 1
+        game = self.engine((20, 150), randomize=False)
+        game.set_runs(iter(runs))
+        self.assertEqual(grid, [list(row) for row in game.curr_generation])
+
+    def test_from_file_rle(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / "glider.rle"
+            path.write_text("#N Glider\n#C Comment\nx = 3, y = 4, rule = B3/S23\nbo$2b\no$3o!\n")
+            game = self.engine.from_file(path)
+        self.assertEqual([[0, 1, 0], [0, 0, 1], [1, 1, 1], [0, 0, 0]], game.curr_generation)
+
+
+class TestSparseLife(TestGameOfLife):
+    engine = life.SparseLife
+
+    def test_glider_on_huge_board(self):
+        game = life.SparseLife((10000, 10000), randomize=False)
+        game.set_alive([(0, 1), (1, 2), (2, 0), (2, 1), (2, 2)])
+        for _ in range(400):
+            game.step()
+        self.assertEqual(
+            {(100, 101), (101, 102), (102, 100), (102, 101), (102, 102)},
+            {game.cell(index) for index in game.alive},
+        )
+        self.assertTrue(game.is_changing)
+
+    def test_matches_dense_engine(self):
+        random.seed(42)
+        dense = life.GameOfLife((30, 40))
+        sparse = life.SparseLife((30, 40), randomize=False)
+        sparse.curr_generation = dense.curr_generation
+        for _ in range(50):
+            dense.step()
+            sparse.step()
+            self.assertEqual(dense.curr_generation, sparse.curr_generation)
+            self.assertEqual(dense.is_changing, sparse.is_changing)
+
+
+@unittest.skipIf(life.np is None, "NumPy is not installed")
+class TestNumpyLife(TestGameOfLife):
+    engine = life.NumpyLife
+
+    def assertEqual(self, first, second, msg=None):
+        # Поколения NumpyLife - массивы, сравниваем их как списки
+        if hasattr(first, "tolist"):
+            first = first.tolist()
+        if hasattr(second, "tolist"):
+            second = second.tolist()
+        super().assertEqual(first, second, msg)
+
+    def test_can_create_a_random_grid(self):
+        game = self.engine((3, 3))
+        random.seed(12345)
+        grid = game.create_grid(randomize=True)
+        random.seed(12345)
+        self.assertEqual(grid, game.create_grid(randomize=True))
+        self.assertEqual("uint8", grid.dtype.name)
+        self.assertEqual((3, 3), grid.shape)
+
+    def test_matches_dense_engine(self):
+        random.seed(42)
+        dense = life.GameOfLife((30, 40))
+        game = self.engine((30, 40), randomize=False)
+        game.curr_generation = dense.curr_generation
+        for _ in range(50):
+            dense.step()
+            game.step()
+            self.assertEqual(dense.curr_generation, game.curr_generation)
+            self.assertEqual(dense.is_changing, game.is_changing)
+
+    def test_save(self):
+        game = self.engine((6, 8))
+        game.curr_generation = self.grid
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / "grid.txt"
+            game.save(path)
+            self.assertEqual(
+                "".join("".join(map(str, row)) + "\n" for row in self.grid), path.read_text()
+            )
+
+
+@unittest.skipIf(life.np is None, "NumPy is not installed")
+class TestPackedLife(TestNumpyLife):
+    engine = life.PackedLife
+
+    def test_matches_numpy_engine_across_words(self):
+        random.seed(7)
+        for size in [(5, 130), (17, 64), (9, 1)]:
+            with self.subTest(size=size):
+                game = life.NumpyLife(size)
+                packed = life.PackedLife(size, randomize=False, stripe=2)
+                packed.curr_generation = game.curr_generation
+                for _ in range(30):
+                    game.step()
+                    packed.step()
+                    self.assertEqual(game.curr_generation, packed.curr_generation)
+
+    def test_glider_crosses_word_boundary(self):
+        game = life.PackedLife((8, 128), randomize=False)
+        grid = [[0] * 128 for _ in range(8)]
+        for i, j in [(0, 61), (1, 62), (2, 60), (2, 61), (2, 62)]:
+            grid[i][j] = 1
+        game.curr_generation = grid
+        for _ in range(8):
+            game.step()
+        self.assertEqual(
+            [(2, 63), (3, 64), (4, 62), (4, 63), (4, 64)],
+            [(i, j) for i in range(8) for j in range(128) if game.get_cell((i, j))],
+        )
+        self.assertEqual(2, game.words.shape[1])
+
+
+class TestHashLife(unittest.TestCase):
+    gun = [
+        "........................O...........",
+        "......................O.O...........",
+        "............OO......OO............OO",
+        "...........O...O....OO............OO",
+        "OO........O.....O...OO..............",
+        "OO........O...O.OO....O.O...........",
+        "..........O.....O.......O...........",
+        "...........O...O....................",
+        "............OO......................",
+    ]
+
+    def test_matches_sparse_engine(self):
+        random.seed(5)
+        soup = [(r + 90, c + 90) for r in range(20) for c in range(20) if random.random() < 0.4]
+        sparse = life.SparseLife((200, 200), randomize=False)
+        sparse.set_alive(soup)
+        game = life.HashLife((200, 200), randomize=False)
+        game.set_alive(soup)
+        for generations in [1, 1, 2, 3, 5, 8, 13]:
+            for _ in range(generations):
+                sparse.step()
+            game.advance(generations)
+            self.assertEqual(sparse.curr_generation, game.curr_generation)
+            if generations == 1:
+                self.assertEqual(set(sparse.changed_cells()), set(game.changed_cells()))
+        self.assertEqual(sparse.generations, game.generations)
+        self.assertEqual(sparse.get_neighbours((100, 100)), game.get_neighbours((100, 100)))
+
+    def test_advance_period(self):
+        blinker = [[0] * 5, [0] * 5, [0, 1, 1, 1, 0], [0] * 5, [0] * 5]
+        game = life.HashLife((5, 5), randomize=False)
+        for generations in (0, -3):
+            with self.assertRaises(ValueError):
+                game.advance(generations)
+        # Прыжки одной длины: период кратен и настоящему периоду 2, и длине прыжка 3
+        game.curr_generation = blinker
+        for _ in range(3):
+            game.advance(3)
+        self.assertEqual((1, 6), (game.cycle_start, game.period))
+        # Прыжки разной длины: цикл найден, но период неизвестен
+        game.curr_generation = blinker
+        game.advance(1)
+        game.advance(2)
+        self.assertEqual((11, None), (game.cycle_start, game.period))
+
+    def test_jump_and_cache_limit(self):
+        cells = [
+            (r, c) for r, line in enumerate(self.gun) for c, ch in enumerate(line) if ch == "O"
+        ]
+        game = life.HashLife((9, 36), randomize=False, max_nodes=5000)
+        game.set_alive(cells)
+        for _ in range(10):
+            game.advance(30 << 30)
+        # Ружье Госпера выпускает планер из 5 клеток каждые 30 поколений
+        self.assertEqual(36 + 5 * (10 << 30), game.population)
+        self.assertLessEqual(len(game.tree.table), 5000)
+        self.assertEqual(
+            [[int(ch == "O") for ch in line] for line in self.gun],
+            game.curr_generation,
+        )
+
+    def test_cache_limit_below_working_set(self):
+        cells = [
+            (r, c) for r, line in enumerate(self.gun) for c, ch in enumerate(line) if ch == "O"
+        ]
+        # Прыжку нужно больше узлов, чем max_nodes: сборки не должны зациклиться
+        game = life.HashLife((9, 36), randomize=False, max_nodes=500)
+        game.set_alive(cells)
+        start = time.monotonic()
+        for _ in range(10):
+            game.advance(30 << 30)
+        self.assertLess(time.monotonic() - start, 30)
+        self.assertEqual(36 + 5 * (10 << 30), game.population)
+
+    def test_save_and_load_rle(self):
+        game = life.HashLife((9, 36), randomize=False)
+        game.curr_generation = [[int(ch == "O") for ch in line] for line in self.gun]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / "gun.rle"
+            game.save(path)
+            loaded = life.HashLife.from_file(path)
+        self.assertEqual(game.curr_generation, loaded.curr_generation)
+        self.assertEqual(36, loaded.population)
+
+    def test_is_changing(self):
+        game = life.HashLife((5, 5), randomize=False)
+        game.curr_generation = [[0, 0, 0, 0, 0], [0, 1, 1, 0, 0], [0, 1, 1, 0, 0], [0] * 5, [0] * 5]
+        self.assertTrue(game.is_changing)
+        game.step()
+        self.assertFalse(game.is_changing)
+        game.curr_generation = [
+            [0, 0, 0, 0, 0],
+            [0, 0, 1, 0, 0],
+            [0, 0, 1, 0, 0],
+            [0, 0, 1, 0, 0],
+            [0] * 5,
+        ]
+        game.step()
+        self.assertTrue(game.is_changing)
+        self.assertEqual(
+            [[0] * 5, [0] * 5, [0, 1, 1, 1, 0], [0] * 5, [0] * 5], game.curr_generation
+        )
+        game.step()
+        self.assertEqual((2, 2), (game.cycle_start, game.period))
+        game.advance(3)
+        self.assertEqual([0, 1, 1, 1, 0], game.curr_generation[2])
+
+
+@unittest.skipIf(life.np is None, "NumPy is not installed")
+class TestParallelLife(unittest.TestCase):
+    def test_matches_numpy_engine(self):
+        random.seed(2)
+        game = life.NumpyLife((50, 37))
+        with life.ParallelLife((50, 37), randomize=False, workers=3) as parallel:
+            parallel.curr_generation = game.curr_generation
+            self.assertEqual(3, len(parallel.stripes))
+            for _ in range(40):
+                game.step()
+                parallel.step()
+                self.assertEqual(game.curr_generation.tolist(), parallel.curr_generation.tolist())
+                self.assertEqual(game.prev_generation.tolist(), parallel.prev_generation.tolist())
+                self.assertEqual(game.is_changing, parallel.is_changing)
+            self.assertEqual(game.generations, parallel.generations)
+
+    def test_is_not_changing(self):
+        with life.ParallelLife((4, 4), randomize=False, workers=2) as game:
+            game.curr_generation = [[0, 0, 0, 0], [0, 1, 1, 0], [0, 1, 1, 0], [0, 0, 0, 0]]
+            self.assertTrue(game.is_changing)
+            game.step()
+            self.assertFalse(game.is_changing)
+            self.assertEqual((1, 1), (game.cycle_start, game.period))
+
+    def test_close_releases_shared_memory(self):
+        game = life.ParallelLife((10, 10), workers=2)
+        names = [buffer.name for buffer in game.buffers]
+        game.close()
+        for name in names:
+            with self.assertRaises(FileNotFoundError):
+                life.SharedMemory(name=name)